@@ -16,4 +16,16 @@ from .slicer import *
 from .subdivision import *
 from .vec import *
 
+# the array based modules require numpy, which is not available in every
+# host application (e.g. Rhino or Processing)
+try:
+    from .arrayMesh import *
+    from .halfEdge import *
+    from .arrayMarchingCubes import *
+    from .arraySubdivision import *
+    from .arrayDecimation import *
+    from .arrayGrid import *
+except ImportError:
+    pass
+
 __all__ = [name for name in dir() if not name.startswith('_')]
@@ -0,0 +1,298 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+__author__     = ['Benjamin Dillenburger','Demetris Shammas','Mathias Bernhard']
+__copyright__  = 'Copyright 2019 / Digital Building Technologies DBT / ETH Zurich'
+__license__    = 'MIT License'
+__email__      = ['<dbt@arch.ethz.ch>']
+
+import heapq
+import numpy as np
+from mola.arrayMesh import ArrayMesh
+from mola.halfEdge import HalfEdgeMesh
+
+def decimateArray(mesh, targetFaces, quads=False, boundaryWeight=1000.0):
+    """
+    Reduces the number of faces of an `ArrayMesh` by collapsing edges in the
+    order of their quadric error (Garland and Heckbert), until at most
+    `targetFaces` triangles are left or no edge can be collapsed without
+    changing the topology or flipping faces. Faces which are not triangles
+    are triangulated first. Triangles keep the color and group of their
+    original face, vertices with `fix` set are not moved.
+
+    Arguments:
+    ----------
+    mesh : mola.arrayMesh.ArrayMesh
+        The mesh to be decimated, it is not modified
+    targetFaces : int
+        The number of triangles to reduce to
+    quads : bool
+        Merge pairs of triangles across their common longest edge into
+        quads, if they have the same color and group, default False
+    boundaryWeight : float
+        The weight of the quadrics which keep boundaries in place, default 1000
+    """
+    mesh = triangulateArray(mesh)
+    decimator = _Decimator(mesh, boundaryWeight)
+    decimator.collapse(targetFaces)
+    result = decimator.getMesh()
+    if quads:
+        result = _mergeQuads(result)
+    return result
+
+def triangulateArray(mesh):
+    """
+    Returns a copy of an `ArrayMesh` with every face split into a fan of
+    triangles around its first vertex, keeping colors and groups.
+    """
+    sizes = mesh.faceSizes()
+    corner = mesh.cornerFaces()
+    local = np.arange(len(mesh.faces)) - mesh.offsets[corner]
+    # one triangle for every corner except the first and the last of its face
+    inner = np.nonzero((local > 0) & (local < sizes[corner] - 1))[0]
+    triangles = np.stack((mesh.faces[mesh.offsets[corner[inner]]],
+                          mesh.faces[inner], mesh.faces[inner + 1]), axis=1)
+    result = ArrayMesh(mesh.vertices.copy(), triangles)
+    source = corner[inner]
+    result.colors = mesh.colors[source]
+    result.groups = [mesh.groups[i] for i in source.tolist()]
+    result.fix = mesh.fix.copy()
+    result.generation = mesh.generation.copy()
+    return result
+
+class _Decimator:
+    # edge collapse state of a triangle mesh, in python lists for fast
+    # single element access
+    def __init__(self, mesh, boundaryWeight):
+        self.mesh = mesh
+        triangles = mesh.getFacesAsArray().reshape(-1, 3)
+        nV = mesh.numVertices()
+        self.faces = triangles.tolist()
+        self.alive = [True] * len(self.faces)
+        self.nFaces = len(self.faces)
+        self.positions = mesh.vertices.tolist()
+        self.fix = mesh.fix.tolist()
+        self.version = [0] * nV
+        self.vertexFaces = [set() for i in range(nV)]
+        for f, triangle in enumerate(self.faces):
+            for v in triangle:
+                self.vertexFaces[v].add(f)
+        he = HalfEdgeMesh(mesh)
+        self.boundary = he.isBoundaryVertex().tolist()
+        self.quadrics = _quadrics(mesh, he, boundaryWeight).tolist()
+        self.heap = []
+        h = he.edgeHalfEdge
+        for a, b in zip(he.vertex[h].tolist(), he.vertex[he.next[h]].tolist()):
+            self._push(a, b)
+        heapq.heapify(self.heap)
+
+    def _push(self, a, b, heap=None):
+        if self.fix[a] and self.fix[b]:
+            return
+        q = [x + y for x, y in zip(self.quadrics[a], self.quadrics[b])]
+        if self.fix[a]:
+            p = self.positions[a]
+        elif self.fix[b]:
+            p = self.positions[b]
+        else:
+            p = _optimalPoint(q)
+            if p is None:
+                # singular quadric, best of the end points and the midpoint
+                pa = self.positions[a]
+                pb = self.positions[b]
+                candidates = [pa, pb, [(x + y) * 0.5 for x, y in zip(pa, pb)]]
+                p = min(candidates, key=lambda c: _quadricError(q, c))
+        entry = (_quadricError(q, p), a, b, self.version[a], self.version[b], p)
+        if heap is None:
+            self.heap.append(entry)
+        else:
+            heapq.heappush(heap, entry)
+
+    def collapse(self, targetFaces):
+        heap = self.heap
+        while self.nFaces > targetFaces and heap:
+            cost, a, b, versionA, versionB, p = heapq.heappop(heap)
+            if versionA != self.version[a] or versionB != self.version[b]:
+                continue
+            if self._canCollapse(a, b, p):
+                self._collapse(a, b, p)
+
+    def _neighbours(self, v):
+        result = set()
+        for f in self.vertexFaces[v]:
+            result.update(self.faces[f])
+        result.discard(v)
+        return result
+
+    def _canCollapse(self, a, b, p):
+        shared = self.vertexFaces[a] & self.vertexFaces[b]
+        if not shared:
+            return False
+        # link condition, a and b only share the vertices opposite to ab
+        opposite = set()
+        for f in shared:
+            opposite.update(self.faces[f])
+        opposite.discard(a)
+        opposite.discard(b)
+        if self._neighbours(a) & self._neighbours(b) != opposite:
+            return False
+        # do not join two boundaries through the inside
+        if self.boundary[a] and self.boundary[b] and len(shared) != 1:
+            return False
+        # no face may flip
+        positions = self.positions
+        for v in (a, b):
+            for f in self.vertexFaces[v] - shared:
+                triangle = self.faces[f]
+                points = [positions[i] for i in triangle]
+                before = _normal(points)
+                points[triangle.index(v)] = p
+                after = _normal(points)
+                # degenerate faces (e.g. from marching cubes) may become valid
+                if _dot(before, after) <= 0 and _dot(before, before) > 0:
+                    return False
+        return True
+
+    def _collapse(self, a, b, p):
+        shared = self.vertexFaces[a] & self.vertexFaces[b]
+        for f in shared:
+            self.alive[f] = False
+            self.nFaces -= 1
+            for v in self.faces[f]:
+                self.vertexFaces[v].discard(f)
+        for f in self.vertexFaces[b]:
+            triangle = self.faces[f]
+            triangle[triangle.index(b)] = a
+        self.vertexFaces[a] |= self.vertexFaces[b]
+        self.vertexFaces[b] = set()
+        self.positions[a] = list(p)
+        self.quadrics[a] = [x + y for x, y in zip(self.quadrics[a], self.quadrics[b])]
+        self.fix[a] = self.fix[a] or self.fix[b]
+        self.boundary[a] = self.boundary[a] or self.boundary[b]
+        self.version[a] += 1
+        self.version[b] += 1
+        for n in self._neighbours(a):
+            self._push(a, n, self.heap)
+
+    def getMesh(self):
+        # the alive triangles with compacted vertices
+        alive = np.array(self.alive, dtype=bool)
+        triangles = np.array(self.faces, dtype=np.int64).reshape(-1, 3)[alive]
+        used = np.unique(triangles)
+        remap = np.full(len(self.positions), -1, dtype=np.int64)
+        remap[used] = np.arange(len(used))
+        result = ArrayMesh(np.array(self.positions)[used], remap[triangles])
+        result.colors = self.mesh.colors[alive]
+        result.groups = [g for g, keep in zip(self.mesh.groups, self.alive) if keep]
+        result.fix = np.array(self.fix, dtype=bool)[used]
+        result.generation = self.mesh.generation[used]
+        return result
+
+def _quadrics(mesh, he, boundaryWeight):
+    # the 10 coefficients of the symmetric 4x4 quadric of every vertex:
+    # the area weighted planes of its faces and the planes perpendicular
+    # to the faces along boundary edges
+    triangles = mesh.getFacesAsArray().reshape(-1, 3)
+    p = mesh.vertices[triangles]
+    normals = np.cross(p[:, 1] - p[:, 0], p[:, 2] - p[:, 0])
+    areas = np.linalg.norm(normals, axis=1) * 0.5
+    lengths = areas * 2
+    lengths[lengths == 0] = 1
+    normals /= lengths[:, None]
+    planes = _planeQuadrics(normals, -np.einsum('ij,ij->i', normals, p[:, 0]), areas)
+    nV = mesh.numVertices()
+    quadrics = np.zeros((nV, 10))
+    for k in range(3):
+        for i in range(10):
+            quadrics[:, i] += np.bincount(triangles[:, k], weights=planes[:, i], minlength=nV)
+    boundary = np.nonzero(he.twin < 0)[0]
+    if len(boundary) > 0:
+        a = mesh.vertices[he.vertex[boundary]]
+        b = mesh.vertices[he.vertex[he.next[boundary]]]
+        side = np.cross(b - a, normals[he.face[boundary]])
+        lengths = np.linalg.norm(side, axis=1)
+        lengths[lengths == 0] = 1
+        side /= lengths[:, None]
+        weights = boundaryWeight * np.einsum('ij,ij->i', b - a, b - a)
+        planes = _planeQuadrics(side, -np.einsum('ij,ij->i', side, a), weights)
+        for ends in (he.vertex[boundary], he.vertex[he.next[boundary]]):
+            for i in range(10):
+                quadrics[:, i] += np.bincount(ends, weights=planes[:, i], minlength=nV)
+    return quadrics
+
+def _planeQuadrics(normals, d, weights):
+    a, b, c = normals[:, 0], normals[:, 1], normals[:, 2]
+    return np.stack((a * a, a * b, a * c, a * d, b * b, b * c, b * d, c * c, c * d, d * d), axis=1) * weights[:, None]
+
+def _quadricError(q, p):
+    x, y, z = p
+    return (q[0] * x * x + 2 * q[1] * x * y + 2 * q[2] * x * z + 2 * q[3] * x
+            + q[4] * y * y + 2 * q[5] * y * z + 2 * q[6] * y
+            + q[7] * z * z + 2 * q[8] * z + q[9])
+
+def _optimalPoint(q):
+    # solves the 3x3 system of the quadric by Cramer's rule
+    a11, a12, a13, a22, a23, a33 = q[0], q[1], q[2], q[4], q[5], q[7]
+    b1, b2, b3 = -q[3], -q[6], -q[8]
+    c11 = a22 * a33 - a23 * a23
+    c12 = a13 * a23 - a12 * a33
+    c13 = a12 * a23 - a13 * a22
+    det = a11 * c11 + a12 * c12 + a13 * c13
+    scale = abs(a11) + abs(a22) + abs(a33)
+    if scale == 0 or abs(det) < 1e-10 * scale * scale * scale:
+        return None
+    c22 = a11 * a33 - a13 * a13
+    c23 = a12 * a13 - a11 * a23
+    c33 = a11 * a22 - a12 * a12
+    return [(c11 * b1 + c12 * b2 + c13 * b3) / det,
+            (c12 * b1 + c22 * b2 + c23 * b3) / det,
+            (c13 * b1 + c23 * b2 + c33 * b3) / det]
+
+def _normal(points):
+    (x1, y1, z1), (x2, y2, z2), (x3, y3, z3) = points
+    ux, uy, uz = x2 - x1, y2 - y1, z2 - z1
+    vx, vy, vz = x3 - x1, y3 - y1, z3 - z1
+    return (uy * vz - uz * vy, uz * vx - ux * vz, ux * vy - uy * vx)
+
+def _dot(u, v):
+    return u[0] * v[0] + u[1] * v[1] + u[2] * v[2]
+
+def _mergeQuads(mesh):
+    # joins two triangles whose longest edges are the same edge into a quad,
+    # if they have the same color and group and are close to coplanar
+    he = HalfEdgeMesh(mesh)
+    nF = mesh.numFaces()
+    vertices = mesh.vertices
+    lengths = np.linalg.norm(vertices[he.vertex[he.next]] - vertices[he.vertex], axis=1)
+    longest = 3 * np.arange(nF) + np.argmax(lengths.reshape(-1, 3), axis=1)
+    twin = he.twin[longest]
+    mutual = twin >= 0
+    mutual[mutual] = longest[he.face[twin[mutual]]] == twin[mutual]
+    first = np.nonzero(mutual)[0]
+    first = first[first < he.face[twin[first]]]
+    second = he.face[twin[first]]
+    normals = mesh.faceNormals()
+    # 0.9 allows about 25 degrees between the two triangles
+    keep = ((np.einsum('ij,ij->i', normals[first], normals[second]) > 0.9)
+            & np.all(mesh.colors[first] == mesh.colors[second], axis=1)
+            & np.array([mesh.groups[i] == mesh.groups[j] for i, j in zip(first.tolist(), second.tolist())], dtype=bool))
+    first = first[keep]
+    second = second[keep]
+    h = longest[first]
+    t = he.twin[h]
+    merged = np.stack((he.vertex[h], he.vertex[he.prev[t]], he.vertex[he.next[h]], he.vertex[he.prev[h]]), axis=1)
+    single = np.ones(nF, dtype=bool)
+    single[first] = False
+    single[second] = False
+    singles = np.nonzero(single)[0]
+    triangles = mesh.getFacesAsArray()[singles]
+    faces = np.concatenate((triangles.ravel(), merged.ravel()))
+    sizes = np.concatenate((np.full(len(singles), 3), np.full(len(first), 4)))
+    offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    result = ArrayMesh(vertices, faces, offsets)
+    source = np.concatenate((singles, first))
+    result.colors = mesh.colors[source]
+    result.groups = [mesh.groups[i] for i in source.tolist()]
+    result.fix = mesh.fix
+    result.generation = mesh.generation
+    return result
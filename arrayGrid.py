@@ -0,0 +1,256 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+__author__     = ['Benjamin Dillenburger','Demetris Shammas','Mathias Bernhard']
+__copyright__  = 'Copyright 2019 / Digital Building Technologies DBT / ETH Zurich'
+__license__    = 'MIT License'
+__email__      = ['<dbt@arch.ethz.ch>']
+
+import numpy as np
+from mola.arrayMesh import ArrayMesh
+from mola.grid import GridManager
+from mola.grid import Grid
+from mola.grid import _directions3D
+from mola.grid import _quadSides
+
+# neighbour offsets (dx, dy, dz) of the neighbourhoods of `mola.grid.GridManager`
+_nbs4 = [(1, 0, 0), (0, 1, 0), (-1, 0, 0), (0, -1, 0)]
+_nbs8 = _nbs4 + [(1, 1, 0), (-1, 1, 0), (-1, -1, 0), (1, -1, 0)]
+# hexagonal neighbours, the diagonal ones depend on the parity of y
+_nbsHex = [(1, 0, 0), (-1, 0, 0), (0, -1, 0), (0, 1, 0)]
+_nbsHexEven = [(1, 1, 0), (1, -1, 0)]
+_nbsHexOdd = [(-1, 1, 0), (-1, -1, 0)]
+_neighbourhoods = {4: _nbs4, 8: _nbs8, 6: _directions3D[1], 18: _directions3D[2], 26: _directions3D[3]}
+
+def _sideCorners():
+    # (6,4,3) grid corner offsets of the quads of the six sides of a cell
+    corners = np.zeros((6, 4, 3), dtype=np.int64)
+    for side, (axis, step, uAxis, vAxis, uvs) in enumerate(_quadSides):
+        if step > 0:
+            corners[side, :, axis] = 1
+        corners[side, :, uAxis] = [uv[0] for uv in uvs]
+        corners[side, :, vAxis] = [uv[1] for uv in uvs]
+    return corners
+
+_sideCorners = _sideCorners()
+
+class ArrayGrid(Grid):
+    """
+    A `Grid` backed by a NumPy array, for cellular automata, diffusion and
+    other rulesets which update all cells at once.
+    The scalar methods of `Grid` (`get_xyz`, `set_xyz`, `getNbs3D`, `getQuadMesh`...)
+    keep working, `sumNbs`, `meanNbs` and `convolve` process all cells in one call.
+
+    Arguments:
+    ----------
+    nX, nY, nZ : int
+        The number of elements in x,y and z direction
+    values : list or numpy.ndarray, optional
+        The initial nX * nY * nZ values, in the index layout of `getIndex`
+    dtype : numpy.dtype, optional
+        The type of the values, default is float
+
+    Attributes
+    ----------
+    array : numpy.ndarray
+        The (nX,nY,nZ) array of values, `array[x,y,z]` is the value at `getIndex(x,y,z)`.
+        Arrays assigned to it are stored as a C-contiguous copy if necessary.
+    values : numpy.ndarray
+        A flat view of `array`, see `getIndex`.
+    """
+    def __init__(self, nX, nY, nZ=1, values=None, dtype=float):
+        GridManager.__init__(self, nX, nY, nZ)
+        if values is None:
+            self.array = np.zeros((nX, nY, nZ), dtype=dtype)
+        else:
+            self.array = np.array(values, dtype=dtype)
+        self.changes = None
+
+    @classmethod
+    def fromGrid(cls, grid, dtype=float):
+        """
+        returns an `ArrayGrid` with a copy of the values of a `Grid`
+        """
+        return cls(grid.nX, grid.nY, grid.nZ, grid.values, dtype)
+
+    @property
+    def array(self):
+        return self._array
+
+    @array.setter
+    def array(self, array):
+        # kept C-contiguous, so that `values` is a view which `set_index` writes through
+        self._array = np.ascontiguousarray(np.reshape(array, (self.nX, self.nY, self.nZ)))
+
+    @property
+    def values(self):
+        return self._array.reshape(-1)
+
+    @values.setter
+    def values(self, values):
+        self.array = values
+
+    def convolve(self, offsets, weights=None, continuous=False, values=None):
+        """
+        returns an (nX,nY,nZ) array with the weighted sum of the values at
+        `offsets` around each cell: result[x,y,z] = sum(w * values[x+dx,y+dy,z+dz]).
+        Offsets outside of the grid are skipped,
+        set `continuous` to `True` to get torus topology.
+
+        Arguments:
+        ----------
+        offsets : list
+            The (dx, dy, dz) offsets of the stencil
+        weights : list, optional
+            The weight of each offset, default is 1
+        continuous : bool, optional
+            Wrap offsets around the borders of the grid
+        values : numpy.ndarray, optional
+            The (nX,nY,nZ) values to convolve, default is `array`
+        """
+        values = self._asArray(values)
+        if weights is None:
+            weights = [1] * len(offsets)
+        result = np.zeros(values.shape, dtype=np.result_type(values, np.asarray(weights)))
+        for offset, weight in zip(offsets, weights):
+            _addShifted(result, values, offset, weight, continuous)
+        return result
+
+    def sumNbs(self, nbs=4, continuous=False, values=None):
+        """
+        returns an (nX,nY,nZ) array with the sum of the neighbour values of each cell,
+        the neighbours are the same as returned by `getNbs2D`, `getNbs2DHex` and `getNbs3D`.
+
+        Arguments:
+        ----------
+        nbs : int or str, optional
+            The neighbourhood, 4 or 8 (`getNbs2D`), 'hex' (`getNbs2DHex`),
+            6, 18 or 26 (`getNbs3D` with mode 1, 2 or 3)
+        continuous : bool, optional
+            Set to `True` to get torus topology
+        values : numpy.ndarray, optional
+            The (nX,nY,nZ) values to sum, default is `array`
+        """
+        values = self._asArray(values)
+        if nbs != 'hex':
+            if nbs not in _neighbourhoods:
+                raise ValueError('unknown neighbourhood: ' + str(nbs))
+            return self.convolve(_neighbourhoods[nbs], None, continuous, values)
+        result = self.convolve(_nbsHex, None, continuous, values)
+        even = self.convolve(_nbsHexEven, None, continuous, values)
+        odd = self.convolve(_nbsHexOdd, None, continuous, values)
+        result[:, 0::2] += even[:, 0::2]
+        result[:, 1::2] += odd[:, 1::2]
+        return result
+
+    def countNbs(self, nbs=4, continuous=False):
+        """
+        returns an (nX,nY,nZ) int array with the number of neighbours of each cell,
+        which is smaller at the borders of a grid which is not `continuous`
+        """
+        return self.sumNbs(nbs, continuous, np.ones(self.array.shape, dtype=np.int64))
+
+    def meanNbs(self, nbs=4, continuous=False, values=None):
+        """
+        returns an (nX,nY,nZ) array with the average of the neighbour values of each cell,
+        see `sumNbs`
+        """
+        return self.sumNbs(nbs, continuous, values) / self.countNbs(nbs, continuous)
+
+    def getQuadMeshArray(self, functionIn, functionOut=None):
+        """
+        Vectorized version of `getQuadMesh`, see `quadMeshArray`.
+
+        Arguments:
+        ----------
+        functionIn : function
+            A function of the (nX,nY,nZ) `array` returning a bool array of the inner cells,
+            e.g. `lambda a: a > 0`
+        functionOut : function, optional
+            The same for the outer cells, by default all cells which are not inside
+        """
+        inside = functionIn(self.array)
+        outside = None if functionOut is None else functionOut(self.array)
+        return quadMeshArray(inside, outside)
+
+    def setArray(self, array):
+        """
+        replaces all values, e.g. by the result of a ruleset iteration,
+        and marks all cells as changed if changes are tracked
+        """
+        self.array = np.asarray(array, dtype=self.array.dtype)
+        if self.changes is not None:
+            self.changes.update(range(self.length))
+
+    def _asArray(self, values):
+        if values is None:
+            return self.array
+        return np.asarray(values).reshape(self.nX, self.nY, self.nZ)
+
+def _addShifted(result, values, offset, weight, continuous):
+    # result[x,y,z] += weight * values[x+dx,y+dy,z+dz]
+    if continuous:
+        shifted = np.roll(values, [-d for d in offset], axis=(0, 1, 2))
+        result += weight * shifted
+        return
+    target = []
+    source = []
+    for d, n in zip(offset, values.shape):
+        if abs(d) >= n:
+            return
+        target.append(slice(max(0, -d), n - max(0, d)))
+        source.append(slice(max(0, d), n + min(0, d)))
+    result[tuple(target)] += weight * values[tuple(source)]
+
+def quadMeshArray(inside, outside=None):
+    """
+    Vectorized version of `mola.grid.Grid.getQuadMesh`, returns an `ArrayMesh`
+    with a quad for every side of an inner cell which is on the border of the grid
+    or next to an outer cell. The quads are the same and in the same order,
+    vertices are shared through the grid corner they lie on.
+
+    Arguments:
+    ----------
+    inside : numpy.ndarray
+        The (nX,nY,nZ) bool array of the inner cells (occupancy)
+    outside : numpy.ndarray, optional
+        The (nX,nY,nZ) bool array of the outer cells, default is `~inside`
+    """
+    inside = np.asarray(inside, dtype=bool)
+    if inside.ndim == 2:
+        inside = inside[:, :, np.newaxis]
+    outside = ~inside if outside is None else np.asarray(outside, dtype=bool).reshape(inside.shape)
+    nX, nY, nZ = inside.shape
+    # pad by one cell, cells beyond the border are outside
+    padDims = (nX + 2, nY + 2, nZ + 2)
+    padOut = np.pad(outside, 1, mode='constant', constant_values=True)
+    # only the inner cells with at least one outer neighbour are visited
+    surface = np.zeros(padDims, dtype=bool)
+    core = surface[1:-1, 1:-1, 1:-1]
+    core |= padOut[2:, 1:-1, 1:-1]
+    core |= padOut[:-2, 1:-1, 1:-1]
+    core |= padOut[1:-1, 2:, 1:-1]
+    core |= padOut[1:-1, :-2, 1:-1]
+    core |= padOut[1:-1, 1:-1, 2:]
+    core |= padOut[1:-1, 1:-1, :-2]
+    core &= inside
+    cells = np.flatnonzero(surface)
+    padOut = padOut.ravel()
+    # the inner cells with an outer neighbour on each side, cell by cell
+    sides = np.array([_quadSides[side][0] for side in range(6)])
+    steps = np.array([_quadSides[side][1] for side in range(6)])
+    padStrides = np.array([padDims[1] * padDims[2], padDims[2], 1])
+    exposed = padOut[cells[:, np.newaxis] + steps * padStrides[sides]]
+    cellIds, sideIds = np.nonzero(exposed)
+    # grid corners of the quads, shared through their index in the (nX+1,nY+1,nZ+1) grid
+    x, y, z = np.unravel_index(cells, padDims)
+    cornerDims = (nX + 1, nY + 1, nZ + 1)
+    cornerStrides = np.array([cornerDims[1] * cornerDims[2], cornerDims[2], 1])
+    base = (x - 1) * cornerStrides[0] + (y - 1) * cornerStrides[1] + (z - 1)
+    cornerIds = base[cellIds][:, np.newaxis] + np.dot(_sideCorners, cornerStrides)[sideIds]
+    used = np.zeros(cornerDims[0] * cornerDims[1] * cornerDims[2], dtype=bool)
+    used[cornerIds.ravel()] = True
+    usedIds = np.flatnonzero(used)
+    vertexIds = np.zeros(len(used), dtype=np.int64)
+    vertexIds[usedIds] = np.arange(len(usedIds))
+    vertices = np.stack(np.unravel_index(usedIds, cornerDims), axis=1).astype(np.float64)
+    return ArrayMesh(vertices, vertexIds[cornerIds])
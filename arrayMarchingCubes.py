@@ -0,0 +1,414 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+__author__     = ['Benjamin Dillenburger','Demetris Shammas','Mathias Bernhard']
+__copyright__  = 'Copyright 2019 / Digital Building Technologies DBT / ETH Zurich'
+__license__    = 'MIT License'
+__email__      = ['<dbt@arch.ethz.ch>']
+
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from mola.arrayMesh import ArrayMesh
+from mola.marchingCubes import _faces
+from mola.marchingCubes import _edgeAxis
+from mola.marchingCubes import _edgeStart
+
+# corner offsets of a cell, in the order of the bits of the case number
+_corners = np.array([(0, 1, 0), (1, 1, 0), (1, 0, 0), (0, 0, 0),
+                     (0, 1, 1), (1, 1, 1), (1, 0, 1), (0, 0, 1)])
+# the 12 cell edges as axis (0: x, 1: y, 2: z) and offset of their start corner
+_edgeAxis = np.array(_edgeAxis)
+_edgeStart = np.array(_edgeStart)
+_axes = np.eye(3, dtype=np.int64)
+# the triangles of each case as cell edges, and their number
+_triangleEdges = np.array(_faces).reshape(256, 5, 3)
+_triangleCounts = (_triangleEdges[:, :, 0] > -1).sum(axis=1)
+
+def marchingCubesArray(nX, nY, nZ, values, iso):
+    """
+    Vectorized version of `mola.marchingCubes.marchingCubes`, returns an
+    `ArrayMesh` of triangles with shared vertices. The triangles are the same
+    and in the same order, vertices are shared through the grid edge they lie on.
+
+    Arguments:
+    ----------
+    nX, nY, nZ : int
+        The number of values in x, y and z direction
+    values : list or numpy.ndarray
+        The nX * nY * nZ values, in the index layout of `mola.grid.GridManager`
+    iso : float
+        The iso value of the surface
+    """
+    block = np.asarray(values, dtype=np.float64).reshape(nX, nY, nZ)
+    edgeIds, vertices, triangles = _marchingCubesBlock(block, iso)
+    return ArrayMesh(vertices, triangles)
+
+def marchingCubesArrayFromGrid(grid, iso):
+    """
+    Vectorized version of `mola.marchingCubes.marchingCubesFromGrid`, returns an `ArrayMesh`.
+    """
+    return marchingCubesArray(grid.nX, grid.nY, grid.nZ, grid.values, iso)
+
+def marchingCubesParallel(nX, nY, nZ, values, iso, workers=None, blocks=None):
+    """
+    Marching cubes in a pool of worker processes. The field is copied once into
+    shared memory and split into blocks along x, which are extracted in parallel.
+    Vertices on the block seams are deduplicated by the grid edge they lie on,
+    the result is the same as `marchingCubesArray`.
+    On platforms which spawn processes (Windows, macOS) call it from
+    within an `if __name__ == '__main__':` block.
+
+    Arguments:
+    ----------
+    nX, nY, nZ : int
+        The number of values in x, y and z direction
+    values : list or numpy.ndarray
+        The nX * nY * nZ values, in the index layout of `mola.grid.GridManager`
+    iso : float
+        The iso value of the surface
+    workers : int
+        The number of worker processes, default the number of cpus
+    blocks : int
+        The number of blocks, default 2 per worker
+    """
+    dims = (nX, nY, nZ)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if blocks is None:
+        blocks = 2 * workers
+    values = np.asarray(values, dtype=np.float64)
+    memory = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    try:
+        field = np.ndarray(dims, dtype=np.float64, buffer=memory.buf)
+        field[:] = values.reshape(dims)
+        del field
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # blocks overlap by one plane of values
+            bounds = np.linspace(0, max(nX - 1, 0), max(1, blocks) + 1).astype(int)
+            tasks = [(memory.name, dims, int(x0), int(x1), iso) for x0, x1 in zip(bounds[:-1], bounds[1:]) if x1 > x0]
+            results = list(executor.map(_marchingCubesWorker, tasks))
+    finally:
+        memory.close()
+        memory.unlink()
+    return _stitchBlocks(results)
+
+def marchingCubesParallelFromGrid(grid, iso, workers=None, blocks=None):
+    """
+    Parallel version of `mola.marchingCubes.marchingCubesFromGrid`, returns an `ArrayMesh`.
+    """
+    return marchingCubesParallel(grid.nX, grid.nY, grid.nZ, grid.values, iso, workers, blocks)
+
+def _marchingCubesWorker(task):
+    name, dims, x0, x1, iso = task
+    memory = shared_memory.SharedMemory(name=name)
+    try:
+        field = np.ndarray(dims, dtype=np.float64, buffer=memory.buf)
+        result = _marchingCubesBlock(field[x0:x1 + 1], iso, (x0, 0, 0), dims)
+        del field
+    finally:
+        memory.close()
+    return result
+
+def _stitchBlocks(results):
+    # joins block results, vertices on the same grid edge are merged
+    if len(results) == 0:
+        return ArrayMesh(None, np.zeros((0, 3), dtype=np.int64))
+    edgeIds = np.concatenate([r[0] for r in results])
+    vertices = np.concatenate([r[1] for r in results])
+    offsets = np.cumsum([0] + [len(r[0]) for r in results])
+    triangles = np.concatenate([r[2] + offset for r, offset in zip(results, offsets)])
+    _, first, inverse = np.unique(edgeIds, return_index=True, return_inverse=True)
+    return ArrayMesh(vertices[first], inverse.ravel()[triangles])
+
+class MinMaxOctree:
+    """
+    A hierarchy of the minimum and maximum values of blocks of a field,
+    to skip the blocks which can not contain the iso surface. It is built once
+    and can extract the surface at any iso value without scanning the field.
+
+    Attributes
+    ----------
+    field : numpy.ndarray
+        The (nX,nY,nZ) values.
+    blockSize : int
+        The number of cells along each side of a block.
+    mins, maxs : list of numpy.ndarray
+        The minimum and maximum values per block, from the blocks (level 0)
+        to the root, each level combines 2 x 2 x 2 blocks of the level below.
+    """
+    def __init__(self, nX, nY, nZ, values, blockSize=8):
+        self.field = np.asarray(values, dtype=np.float64).reshape(nX, nY, nZ)
+        self.blockSize = blockSize
+        self.update()
+
+    @classmethod
+    def fromGrid(cls, grid, blockSize=8):
+        """
+        Builds the tree over the values of a `mola.grid.Grid`.
+        """
+        return cls(grid.nX, grid.nY, grid.nZ, grid.values, blockSize)
+
+    def update(self):
+        """
+        Recomputes the tree after the values of `field` have been changed.
+        """
+        mins = self.field
+        maxs = self.field
+        if min(self.field.shape) < 2:
+            mins = maxs = np.zeros((0, 0, 0))
+        else:
+            for axis in range(3):
+                mins = _reduceBlocks(np.minimum, mins, axis, self.blockSize)
+                maxs = _reduceBlocks(np.maximum, maxs, axis, self.blockSize)
+        self.mins = [mins]
+        self.maxs = [maxs]
+        while max(mins.shape) > 1:
+            mins = _reduceLevel(np.minimum, mins, np.inf)
+            maxs = _reduceLevel(np.maximum, maxs, -np.inf)
+            self.mins.append(mins)
+            self.maxs.append(maxs)
+
+    def activeBlocks(self, iso):
+        """
+        Returns the (K,3) indices of the blocks which contain the iso value.
+        """
+        nodes = np.zeros((1, 3), dtype=np.int64)
+        for level in range(len(self.mins) - 1, -1, -1):
+            mins = self.mins[level]
+            maxs = self.maxs[level]
+            if level < len(self.mins) - 1:
+                nodes = (nodes[:, None, :] * 2 + _children[None, :, :]).reshape(-1, 3)
+                nodes = nodes[np.all(nodes < mins.shape, axis=1)]
+            x, y, z = nodes.T
+            nodes = nodes[(mins[x, y, z] <= iso) & (maxs[x, y, z] > iso)]
+        return nodes
+
+    def marchingCubes(self, iso):
+        """
+        Extracts the iso surface from the active blocks only, returns an `ArrayMesh`
+        with the same triangles as `marchingCubesArray`, ordered by block.
+        """
+        blocks = self.activeBlocks(iso)
+        dims = self.field.shape
+        if len(blocks) == 0:
+            return ArrayMesh(None, np.zeros((0, 3), dtype=np.int64))
+        size = self.blockSize
+        origins = blocks * size
+        # gather the values of the active blocks, clipped at the end of the field
+        r = np.arange(size + 1)
+        ix = np.minimum(origins[:, 0, None] + r, dims[0] - 1)
+        iy = np.minimum(origins[:, 1, None] + r, dims[1] - 1)
+        iz = np.minimum(origins[:, 2, None] + r, dims[2] - 1)
+        values = self.field[ix[:, :, None, None], iy[:, None, :, None], iz[:, None, None, :]]
+        case = _cubeCases(values, iso)
+        # cells outside of the field
+        for axis in range(3):
+            outside = origins[:, axis, None] + np.arange(size) >= dims[axis] - 1
+            shape = [len(blocks), 1, 1, 1]
+            shape[axis + 1] = size
+            case[np.broadcast_to(outside.reshape(shape), case.shape)] = 0
+        ids = _triangleEdgeIds(case, origins, dims)
+        edgeIds, triangles = np.unique(ids, return_inverse=True)
+        vertices = _edgeVertices(edgeIds, self.field, iso, np.zeros(3, dtype=np.int64), dims)
+        return ArrayMesh(vertices, triangles.reshape(-1, 3))
+
+_children = np.array([(i, j, k) for i in (0, 1) for j in (0, 1) for k in (0, 1)])
+
+def _reduceBlocks(function, values, axis, size):
+    # reduces the values [b*size, (b+1)*size] of every block b along axis
+    n = values.shape[axis]
+    starts = np.arange(0, n - 1, size)
+    reduced = function.reduceat(values, starts, axis=axis)
+    ends = np.take(values, np.minimum(starts + size, n - 1), axis=axis)
+    return function(reduced, ends)
+
+def _reduceLevel(function, values, padding):
+    # combines 2 x 2 x 2 blocks into one
+    shape = [(n + 1) // 2 * 2 for n in values.shape]
+    padded = np.full(shape, padding)
+    padded[:values.shape[0], :values.shape[1], :values.shape[2]] = values
+    nx, ny, nz = [n // 2 for n in shape]
+    return function.reduce(padded.reshape(nx, 2, ny, 2, nz, 2), axis=(1, 3, 5))
+
+class ArrayMeshBuilder:
+    """
+    Collects vertices and faces added in parts, e.g. as the sink of
+    `marchingCubesStream`, and joins them into one `ArrayMesh`.
+    """
+    def __init__(self):
+        self.vertices = []
+        self.faces = []
+        self.vertexCount = 0
+
+    def addVertices(self, vertices):
+        """
+        Adds (n,3) vertices, numbered in the order they are added, starting with 0.
+        """
+        self.vertices.append(np.asarray(vertices, dtype=np.float64).reshape(-1, 3))
+        self.vertexCount += len(self.vertices[-1])
+
+    def addFaces(self, faces):
+        """
+        Adds (n,k) faces as rows of vertex indices.
+        """
+        self.faces.append(np.asarray(faces, dtype=np.int64))
+
+    def getMesh(self):
+        """
+        Returns the `ArrayMesh` of all vertices and faces added so far.
+        """
+        vertices = np.concatenate(self.vertices) if self.vertices else None
+        faces = np.concatenate(self.faces) if self.faces else np.zeros((0, 3), dtype=np.int64)
+        return ArrayMesh(vertices, faces)
+
+def marchingCubesStream(nX, nY, nZ, source, iso, sink=None, slabSize=16):
+    """
+    Marching cubes over a field which is read slab by slab along x, for fields
+    larger than the memory. Vertices on the planes between slabs are welded,
+    peak memory scales with one slab of `slabSize` x nY x nZ values.
+
+    Arguments:
+    ----------
+    nX, nY, nZ : int
+        The number of values in x, y and z direction
+    source : array-like
+        The values, either of shape (nX,nY,nZ) and sliceable along x like
+        a `numpy.memmap` or a HDF5 dataset, or a flat sequence in the index
+        layout of `mola.grid.GridManager`
+    iso : float
+        The iso value of the surface
+    sink : object
+        Receives the result through `addVertices(vertices)` and `addFaces(triangles)`,
+        e.g. an `ArrayMeshBuilder` or a `mola.io.OBJWriter`, default a new `ArrayMeshBuilder`
+    slabSize : int
+        The number of cell layers extracted at once
+
+    Returns:
+    --------
+    object
+        The sink
+    """
+    if sink is None:
+        sink = ArrayMeshBuilder()
+    dims = (nX, nY, nZ)
+    nYZ = nY * nZ
+    flat = getattr(source, 'ndim', 1) != 3
+    vertexCount = 0
+    # edge ids and vertex indices on the plane shared with the previous slab
+    sharedIds = np.zeros(0, dtype=np.int64)
+    sharedIndices = np.zeros(0, dtype=np.int64)
+    slabSize = max(1, slabSize)
+    for x0 in range(0, max(nX - 1, 0), slabSize):
+        x1 = min(x0 + slabSize, nX - 1)
+        if flat:
+            block = source[x0 * nYZ:(x1 + 1) * nYZ]
+        else:
+            block = source[x0:x1 + 1]
+        block = np.asarray(block, dtype=np.float64).reshape(x1 + 1 - x0, nY, nZ)
+        edgeIds, vertices, triangles = _marchingCubesBlock(block, iso, (x0, 0, 0), dims)
+        indices = np.full(len(edgeIds), -1, dtype=np.int64)
+        if len(sharedIds) > 0 and len(edgeIds) > 0:
+            pos = np.minimum(np.searchsorted(sharedIds, edgeIds), len(sharedIds) - 1)
+            found = sharedIds[pos] == edgeIds
+            indices[found] = sharedIndices[pos[found]]
+        new = indices < 0
+        indices[new] = np.arange(vertexCount, vertexCount + np.count_nonzero(new))
+        vertexCount += np.count_nonzero(new)
+        if np.any(new):
+            sink.addVertices(vertices[new])
+        if len(triangles) > 0:
+            sink.addFaces(indices[triangles])
+        # y and z edges on the last plane are shared with the next slab
+        onPlane = (edgeIds >= nX * nYZ) & ((edgeIds % (nX * nYZ)) // nYZ == x1)
+        sharedIds = edgeIds[onPlane]
+        sharedIndices = indices[onPlane]
+    return sink
+
+def _edgeVertices(edgeIds, block, iso, origin, dims):
+    # positions of the iso crossings on the grid edges with the ids edgeIds
+    nX, nY, nZ = dims
+    n = nX * nY * nZ
+    axis = edgeIds // n
+    p = edgeIds % n
+    start = np.stack((p // (nY * nZ), (p // nZ) % nY, p % nZ), axis=1)
+    local = start - origin
+    end = local + _axes[axis]
+    v1 = block[local[:, 0], local[:, 1], local[:, 2]]
+    v2 = block[end[:, 0], end[:, 1], end[:, 2]]
+    delta = v2 - v1
+    flat = np.abs(delta) < 0.0000001
+    t = np.where(flat, 0.0, (iso - v1) / np.where(flat, 1.0, delta))
+    vertices = start.astype(np.float64)
+    vertices[np.arange(len(axis)), axis] += t
+    return vertices
+
+def _marchingCubesBlock(block, iso, origin=(0, 0, 0), dims=None):
+    """
+    Extracts the iso surface of the cells of a block of values.
+
+    Arguments:
+    ----------
+    block : numpy.ndarray
+        The (bx,by,bz) values of a part of the field
+    origin : tuple
+        The index of block[0,0,0] in the field
+    dims : tuple
+        The size of the field, default the size of the block
+
+    Returns:
+    --------
+    edgeIds : numpy.ndarray
+        The sorted ids of the field edges the vertices lie on,
+        the same in every block of the field
+    vertices : numpy.ndarray
+        The (E,3) vertex positions
+    triangles : numpy.ndarray
+        The (T,3) vertex indices of the triangles
+    """
+    if dims is None:
+        dims = block.shape
+    origin = np.asarray(origin, dtype=np.int64)
+    if min(block.shape) < 2:
+        return _emptyBlock()
+    case = _cubeCases(block[None], iso)
+    ids = _triangleEdgeIds(case, origin[None], dims)
+    if len(ids) == 0:
+        return _emptyBlock()
+    edgeIds, triangles = np.unique(ids, return_inverse=True)
+    vertices = _edgeVertices(edgeIds, block, iso, origin, dims)
+    return edgeIds, vertices, triangles.reshape(-1, 3)
+
+def _cubeCases(blocks, iso):
+    # case numbers of the cells of a (K,bx,by,bz) stack of blocks
+    k, bx, by, bz = blocks.shape
+    above = blocks > iso
+    case = np.zeros((k, bx - 1, by - 1, bz - 1), dtype=np.uint8)
+    for i, (dx, dy, dz) in enumerate(_corners):
+        case |= above[:, dx:bx - 1 + dx, dy:by - 1 + dy, dz:bz - 1 + dz].view(np.uint8) << i
+    return case
+
+def _triangleEdgeIds(case, origins, dims):
+    # (T,3) field edge ids of the triangles of a (K,cx,cy,cz) stack of cell cases,
+    # origins are the field indices of the first cell of each block
+    nX, nY, nZ = dims
+    shape = case.shape
+    case = case.ravel()
+    counts = _triangleCounts[case]
+    cells = np.flatnonzero(counts)
+    if len(cells) == 0:
+        return np.zeros((0, 3), dtype=np.int64)
+    counts = counts[cells]
+    cellOfTriangle = np.repeat(cells, counts)
+    slot = np.arange(len(cellOfTriangle)) - np.repeat(np.cumsum(counts) - counts, counts)
+    local = _triangleEdges[case[cellOfTriangle], slot]
+    k, cx, cy, cz = np.unravel_index(cellOfTriangle, shape)
+    origin = origins[k]
+    start = _edgeStart[local]
+    gx = (cx + origin[:, 0])[:, None] + start[:, :, 0]
+    gy = (cy + origin[:, 1])[:, None] + start[:, :, 1]
+    gz = (cz + origin[:, 2])[:, None] + start[:, :, 2]
+    return _edgeAxis[local] * (nX * nY * nZ) + (gx * nY + gy) * nZ + gz
+
+def _emptyBlock():
+    return np.zeros(0, dtype=np.int64), np.zeros((0, 3)), np.zeros((0, 3), dtype=np.int64)
@@ -0,0 +1,328 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+__author__     = ['Benjamin Dillenburger','Demetris Shammas','Mathias Bernhard']
+__copyright__  = 'Copyright 2019 / Digital Building Technologies DBT / ETH Zurich'
+__license__    = 'MIT License'
+__email__      = ['<dbt@arch.ethz.ch>']
+
+import numpy as np
+from mola.core import Mesh
+from mola.core import Vertex
+from mola.core import Face
+from mola.core import Box
+from mola.core import SlotVertex
+from mola.core import SlotFace
+
+class ArrayMesh:
+    """An `ArrayMesh` stores a mesh in contiguous NumPy buffers instead of
+    one Python object per `Vertex` and `Face`.
+    Faces of any size (n-gons) are stored in a compressed sparse row (CSR) layout:
+    the vertex indices of face `i` are `faces[offsets[i]:offsets[i+1]]`.
+
+    Attributes
+    ----------
+    vertices : numpy.ndarray
+        The (N,3) float64 array of vertex coordinates.
+    faces : numpy.ndarray
+        The flat int64 array of the vertex indices of all faces.
+    offsets : numpy.ndarray
+        The (F+1,) int64 array of start positions of each face in `faces`.
+    colors : numpy.ndarray
+        The (F,4) float64 array of face colors (r, g, b, a).
+    groups : list
+        The group of every face.
+    fix : numpy.ndarray
+        The (N,) bool array of the `fix` flags of the vertices.
+    generation : numpy.ndarray
+        The (N,) int64 array of the `generation` of the vertices.
+    """
+    def __init__(self, vertices=None, faces=None, offsets=None):
+        if vertices is None:
+            vertices = np.zeros((0, 3))
+        self.vertices = np.ascontiguousarray(vertices, dtype=np.float64).reshape(-1, 3)
+        if faces is None:
+            faces = np.zeros(0, dtype=np.int64)
+        faces = np.asarray(faces, dtype=np.int64)
+        if offsets is None:
+            # faces given as a (F,k) array of equally sized faces
+            if faces.ndim == 1:
+                faces = faces.reshape(0, 0) if faces.size == 0 else faces.reshape(1, -1)
+            nFaces, size = faces.shape
+            offsets = np.arange(nFaces + 1, dtype=np.int64) * size
+            faces = faces.ravel()
+        self.faces = np.ascontiguousarray(faces, dtype=np.int64)
+        self.offsets = np.ascontiguousarray(offsets, dtype=np.int64)
+        nFaces = len(self.offsets) - 1
+        self.colors = np.ones((nFaces, 4))
+        self.groups = [0] * nFaces
+        self.fix = np.zeros(len(self.vertices), dtype=bool)
+        self.generation = np.zeros(len(self.vertices), dtype=np.int64)
+
+    @classmethod
+    def fromMesh(cls, mesh):
+        """
+        Creates an `ArrayMesh` from a `mola.core.Mesh`.
+        The vertices keep the order of `mesh.vertices`, vertices which are
+        only referenced by faces are appended in order of appearance.
+
+        Arguments:
+        ----------
+        mesh : mola.core.Mesh
+            The mesh to be converted
+        """
+        vertexIds = {}
+        vertices = []
+        for v in mesh.vertices:
+            if id(v) not in vertexIds:
+                vertexIds[id(v)] = len(vertices)
+                vertices.append(v)
+        faces = []
+        sizes = []
+        for f in mesh.faces:
+            for v in f.vertices:
+                index = vertexIds.get(id(v))
+                if index is None:
+                    index = len(vertices)
+                    vertexIds[id(v)] = index
+                    vertices.append(v)
+                faces.append(index)
+            sizes.append(len(f.vertices))
+        offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+        coords = np.array([(v.x, v.y, v.z) for v in vertices], dtype=np.float64)
+        arrayMesh = cls(coords, faces, offsets)
+        arrayMesh.fix = np.array([v.fix for v in vertices], dtype=bool)
+        arrayMesh.generation = np.array([v.generation for v in vertices], dtype=np.int64)
+        if len(mesh.faces) > 0:
+            arrayMesh.colors = np.array([_color4(f.color) for f in mesh.faces], dtype=np.float64)
+        arrayMesh.groups = [f.group for f in mesh.faces]
+        return arrayMesh
+
+    def toMesh(self, slots=False):
+        """
+        Returns a `mola.core.Mesh` with one `Vertex` per row of `vertices`
+        and one `Face` per face, sharing the vertex objects.
+
+        Arguments:
+        ----------
+        slots : bool
+            Create `SlotVertex` and `SlotFace` objects instead, default False
+        """
+        vertexClass = SlotVertex if slots else Vertex
+        faceClass = SlotFace if slots else Face
+        mesh = Mesh()
+        vertices = []
+        for (x, y, z), fix, generation in zip(self.vertices.tolist(), self.fix.tolist(), self.generation.tolist()):
+            v = vertexClass(x, y, z)
+            v.fix = fix
+            v.generation = generation
+            vertices.append(v)
+        faces = self.faces.tolist()
+        offsets = self.offsets.tolist()
+        colors = self.colors.tolist()
+        for i in range(self.numFaces()):
+            f = faceClass([vertices[j] for j in faces[offsets[i]:offsets[i + 1]]])
+            f.color = tuple(colors[i])
+            f.group = self.groups[i]
+            mesh.faces.append(f)
+        mesh.vertices = vertices
+        return mesh
+
+    def copy(self):
+        """
+        Returns a deep copy of this `ArrayMesh`.
+        """
+        arrayMesh = ArrayMesh(self.vertices.copy(), self.faces.copy(), self.offsets.copy())
+        arrayMesh.colors = self.colors.copy()
+        arrayMesh.groups = list(self.groups)
+        arrayMesh.fix = self.fix.copy()
+        arrayMesh.generation = self.generation.copy()
+        return arrayMesh
+
+    def numVertices(self):
+        """
+        Returns the number of vertices.
+        """
+        return len(self.vertices)
+
+    def numFaces(self):
+        """
+        Returns the number of faces.
+        """
+        return len(self.offsets) - 1
+
+    def faceSizes(self):
+        """
+        Returns an array with the number of vertices of each face.
+        """
+        return np.diff(self.offsets)
+
+    def cornerFaces(self):
+        """
+        Returns for every entry of `faces` the index of the face it belongs to.
+        """
+        return np.repeat(np.arange(self.numFaces()), self.faceSizes())
+
+    def getFace(self, index):
+        """
+        Returns the vertex indices of the face at `index`.
+        """
+        return self.faces[self.offsets[index]:self.offsets[index + 1]]
+
+    def getFacesAsArray(self):
+        """
+        Returns the faces as a (F,k) array if all faces have the same number
+        of vertices k, e.g. (F,3) for triangle meshes.
+        """
+        sizes = self.faceSizes()
+        if len(sizes) == 0:
+            return self.faces.reshape(0, 0)
+        if np.any(sizes != sizes[0]):
+            raise ValueError('faces have different numbers of vertices')
+        return self.faces.reshape(-1, sizes[0])
+
+    def faceCenters(self):
+        """
+        Returns the (F,3) array of the face centers (average of their vertices).
+        """
+        sums = np.zeros((self.numFaces(), 3))
+        np.add.at(sums, self.cornerFaces(), self.vertices[self.faces])
+        return sums / self.faceSizes()[:, None]
+
+    def faceNormals(self):
+        """
+        Returns the (F,3) array of the unit normals of the faces, calculated
+        from their first 3 vertices like `mola.faceUtils.normal`.
+        """
+        first = self.offsets[:-1]
+        v1 = self.vertices[self.faces[first]]
+        v2 = self.vertices[self.faces[first + 1]]
+        v3 = self.vertices[self.faces[first + 2]]
+        normals = np.cross(v2 - v1, v3 - v1)
+        lengths = np.linalg.norm(normals, axis=1)
+        lengths[lengths == 0] = 1
+        return normals / lengths[:, None]
+
+    def weldVertices(self, epsilon=0):
+        """
+        Merges vertices with equal coordinates, or with `epsilon` > 0 vertices
+        which round to the same point of a grid with spacing `epsilon`,
+        like `mola.core.Mesh.weldVertices`. Merged vertices keep the position
+        of their first vertex, unused vertices are kept.
+
+        Arguments:
+        ----------
+        epsilon : float
+            The welding tolerance, default 0 (exact)
+
+        Returns:
+        --------
+        numpy.ndarray
+            For each previous vertex the index of its welded vertex.
+        """
+        remap, first = weldPoints(self.vertices, epsilon)
+        self.vertices = self.vertices[first]
+        self.fix = self.fix[first]
+        self.generation = self.generation[first]
+        self.faces = remap[self.faces]
+        return remap
+
+    def scale(self, sx, sy, sz):
+        """
+        scales the mesh by multiplying the vertex coordinates with sx, sy and sz.
+        """
+        self.vertices *= (sx, sy, sz)
+
+    def translate(self, tx, ty, tz):
+        """
+        translates the mesh by adding tx, ty and tz
+        to the position of the vertices.
+        """
+        self.vertices += (tx, ty, tz)
+
+    def getBounds(self):
+        """
+        returns the bounding box of the vertices referenced by faces.
+        """
+        box = Box()
+        if len(self.faces) > 0:
+            used = self.vertices[np.unique(self.faces)]
+            x1, y1, z1 = used.min(axis=0).tolist()
+            x2, y2, z2 = used.max(axis=0).tolist()
+            box = Box(x1, y1, z1, x2, y2, z2)
+        return box
+
+def weldPoints(points, epsilon=0):
+    """
+    Finds the groups of equal points of a (N,3) array in near linear time.
+    With `epsilon` > 0, points are hashed to the cells of a grid with spacing
+    `epsilon`, points in the same cell are equal and so are points closer than
+    `epsilon` in neighbouring cells (see `mola.core.Mesh.weldVertices`).
+
+    Returns:
+    --------
+    tuple of numpy.ndarray
+        `remap`, for each point the index of its group, and `first`, the index
+        of the first point of each group, groups ordered by their first point.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    if len(points) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    if epsilon > 0:
+        cells = np.round(points / epsilon).astype(np.int64)
+        # one cell of margin, so that neighbour keys do not wrap around
+        cells -= cells.min(axis=0) - 1
+        dims = cells.max(axis=0) + 2
+        if float(dims[0]) * float(dims[1]) * float(dims[2]) < 2 ** 62:
+            # one integer key per cell sorts much faster than rows
+            keys = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+            cellKeys, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+            roots = _weldNeighbourCells(points, epsilon, cellKeys, first, dims)[inverse.ravel()]
+            _, first, inverse = np.unique(first[roots], return_index=True, return_inverse=True)
+        else:
+            _, first, inverse = np.unique(cells, axis=0, return_index=True, return_inverse=True)
+    else:
+        _, first, inverse = np.unique(points, axis=0, return_index=True, return_inverse=True)
+    inverse = inverse.ravel()
+    # renumber the groups in order of their first point
+    order = np.argsort(first, kind='stable')
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    return rank[inverse], first[order]
+
+def _weldNeighbourCells(points, epsilon, cellKeys, first, dims):
+    # links each cell to the earliest neighbour cell whose first point is
+    # closer than epsilon, returns the root cell of every cell
+    nCells = len(cellKeys)
+    order = np.argsort(first)
+    rank = np.empty(nCells, dtype=np.int64)
+    rank[order] = np.arange(nCells)
+    parent = np.arange(nCells)
+    representatives = points[first]
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            for dz in (-1, 0, 1):
+                if dx == 0 and dy == 0 and dz == 0:
+                    continue
+                nbKeys = cellKeys + (dx * dims[1] + dy) * dims[2] + dz
+                pos = np.minimum(np.searchsorted(cellKeys, nbKeys), nCells - 1)
+                found = cellKeys[pos] == nbKeys
+                cells = np.nonzero(found)[0]
+                nbs = pos[found]
+                earlier = rank[nbs] < rank[cells]
+                cells = cells[earlier]
+                nbs = nbs[earlier]
+                d = representatives[cells] - representatives[nbs]
+                close = np.einsum('ij,ij->i', d, d) <= epsilon * epsilon
+                np.minimum.at(parent, rank[cells[close]], rank[nbs[close]])
+    # parent is indexed by rank and points to earlier ranks, follow it to the roots
+    while True:
+        grandParent = parent[parent]
+        if np.array_equal(grandParent, parent):
+            break
+        parent = grandParent
+    return order[parent[rank]]
+
+def _color4(color):
+    # pad (r,g,b) colors with alpha 1
+    return tuple(color) + (1,) * (4 - len(color))
@@ -0,0 +1,837 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+__author__     = ['Benjamin Dillenburger','Demetris Shammas','Mathias Bernhard']
+__copyright__  = 'Copyright 2019 / Digital Building Technologies DBT / ETH Zurich'
+__license__    = 'MIT License'
+__email__      = ['<dbt@arch.ethz.ch>']
+
+import numpy as np
+from mola.arrayMesh import ArrayMesh
+from mola.halfEdge import HalfEdgeMesh
+# scipy is optional, it speeds up the sparse stencil products
+try:
+    from scipy import sparse as _sparse
+except ImportError:
+    _sparse = None
+
+def subdivideCatmullArray(mesh, levels=1):
+    """
+    Catmull-Clark subdivision of an `ArrayMesh`, the array version of
+    `mola.subdivision.subdivideCatmull`. Face, edge and vertex points are
+    computed with vectorized gathers and scatters over a `HalfEdgeMesh`.
+    As in `subdivideCatmull`, vertices on the boundary and vertices with
+    `fix` set keep their position, edge points on the boundary and between
+    two vertices with `fix` set are fixed. The input mesh is not modified.
+
+    Arguments:
+    ----------
+    mesh : mola.arrayMesh.ArrayMesh
+        The mesh to be subdivided
+    levels : int
+        The number of subdivision steps, default 1
+
+    Returns:
+    --------
+    mola.arrayMesh.ArrayMesh
+        The subdivided mesh of quads, vertices ordered as vertex points,
+        edge points and face points
+    """
+    for level in range(levels):
+        mesh = _catmullStep(HalfEdgeMesh(mesh))
+    return mesh
+
+def _catmullStep(he):
+    mesh = he.mesh
+    vertices = mesh.vertices
+    nV = mesh.numVertices()
+    nE = he.numEdges()
+    facePoints = mesh.faceCenters()
+
+    # edge points
+    h = he.edgeHalfEdge
+    t = he.twin[h]
+    e0 = he.vertex[h]
+    e1 = he.vertex[he.next[h]]
+    edgePoints = (vertices[e0] + vertices[e1]) * 0.5
+    inner = t >= 0
+    edgePoints[inner] = (vertices[e0[inner]] + vertices[e1[inner]]
+                         + facePoints[he.face[h[inner]]] + facePoints[he.face[t[inner]]]) * 0.25
+    edgeFix = ~inner | (mesh.fix[e0] & mesh.fix[e1])
+    fix = mesh.fix | he.isBoundaryVertex()
+
+    # vertex points, summing over the outgoing half-edges of each vertex
+    origin = he.vertex
+    dest = he.vertex[he.next]
+    n = np.bincount(origin, minlength=nV).astype(np.float64)
+    sumFaces = _scatterAdd(origin, facePoints[he.face], nV)
+    sumEdges = _scatterAdd(origin, (vertices[origin] + vertices[dest]) * 0.5, nV)
+    move = ~fix & (n > 0)
+    nm = n[move][:, None]
+    vertexPoints = vertices.copy()
+    vertexPoints[move] = (vertices[move] * (nm - 3) + sumFaces[move] / nm + sumEdges[move] * 2.0 / nm) / nm
+
+    # one quad per corner: edge point before, vertex, edge point after, face point
+    corners = he.prev
+    quads = np.stack((nV + he.edge[he.prev[corners]],
+                      he.vertex[corners],
+                      nV + he.edge[corners],
+                      nV + nE + he.face[corners]), axis=1)
+    result = ArrayMesh(np.concatenate((vertexPoints, edgePoints, facePoints)), quads)
+    sizes = mesh.faceSizes()
+    result.colors = np.repeat(mesh.colors, sizes, axis=0)
+    result.groups = [g for g, size in zip(mesh.groups, sizes.tolist()) for i in range(size)]
+    result.fix = np.concatenate((fix, edgeFix, np.zeros(mesh.numFaces(), dtype=bool)))
+    result.generation = np.zeros(len(result.vertices), dtype=np.int64)
+    result.generation[:nV] = np.where(fix, mesh.generation, 0)
+    return result
+
+def subdivideLoopArray(mesh, levels=1):
+    """
+    Loop subdivision of a triangle `ArrayMesh`, every triangle is split into
+    four triangles. Vertices on the boundary and vertices with `fix` set keep
+    their position, like in `subdivideCatmullArray`.
+
+    Arguments:
+    ----------
+    mesh : mola.arrayMesh.ArrayMesh
+        The triangle mesh to be subdivided
+    levels : int
+        The number of subdivision steps, default 1
+
+    Returns:
+    --------
+    mola.arrayMesh.ArrayMesh
+        The subdivided triangle mesh, vertices ordered as vertex points
+        and edge points
+    """
+    _checkTriangles(mesh)
+    for level in range(levels):
+        mesh = _loopStep(HalfEdgeMesh(mesh))
+    return mesh
+
+def subdivideSqrt3Array(mesh, levels=1):
+    """
+    Sqrt(3) subdivision of a triangle `ArrayMesh` (Kobbelt), every triangle
+    is split at its center and the original edges are flipped, which triples
+    the number of faces per level. Vertices on the boundary and vertices
+    with `fix` set keep their position, boundary edges are not flipped.
+
+    Arguments:
+    ----------
+    mesh : mola.arrayMesh.ArrayMesh
+        The triangle mesh to be subdivided
+    levels : int
+        The number of subdivision steps, default 1
+
+    Returns:
+    --------
+    mola.arrayMesh.ArrayMesh
+        The subdivided triangle mesh, vertices ordered as vertex points
+        and face points
+    """
+    _checkTriangles(mesh)
+    for level in range(levels):
+        mesh = _sqrt3Step(HalfEdgeMesh(mesh))
+    return mesh
+
+def _checkTriangles(mesh):
+    if np.any(mesh.faceSizes() != 3):
+        raise ValueError('the mesh has faces which are not triangles')
+
+def _loopStep(he):
+    mesh = he.mesh
+    vertices = mesh.vertices
+    nV = mesh.numVertices()
+    nE = he.numEdges()
+
+    # edge points, 3/8 of the edge and 1/8 of the opposite vertices
+    h = he.edgeHalfEdge
+    t = he.twin[h]
+    e0 = he.vertex[h]
+    e1 = he.vertex[he.next[h]]
+    edgePoints = (vertices[e0] + vertices[e1]) * 0.5
+    inner = t >= 0
+    opposite = vertices[he.vertex[he.prev[h[inner]]]] + vertices[he.vertex[he.prev[t[inner]]]]
+    edgePoints[inner] = (vertices[e0[inner]] + vertices[e1[inner]]) * 0.375 + opposite * 0.125
+    edgeFix = ~inner | (mesh.fix[e0] & mesh.fix[e1])
+    fix = mesh.fix | he.isBoundaryVertex()
+
+    # vertex points
+    n = np.bincount(he.vertex, minlength=nV).astype(np.float64)
+    ring = _scatterAdd(he.vertex, vertices[he.vertex[he.next]], nV)
+    move = ~fix & (n > 0)
+    nm = n[move]
+    beta = (0.625 - (0.375 + 0.25 * np.cos(2 * np.pi / nm)) ** 2) / nm
+    vertexPoints = vertices.copy()
+    vertexPoints[move] = vertices[move] * (1 - nm * beta)[:, None] + ring[move] * beta[:, None]
+
+    # three corner triangles and the center triangle per face
+    corners = he.faceHalfEdge
+    triangles = []
+    for c in (corners, he.next[corners], he.prev[corners]):
+        triangles.append(np.stack((he.vertex[c], nV + he.edge[c], nV + he.edge[he.prev[c]]), axis=1))
+    triangles.append(nV + he.edge[np.stack((corners, he.next[corners], he.prev[corners]), axis=1)])
+    faces = np.stack(triangles, axis=1).reshape(-1, 3)
+    result = ArrayMesh(np.concatenate((vertexPoints, edgePoints)), faces)
+    _copyFaceProperties(mesh, result, 4)
+    result.fix = np.concatenate((fix, edgeFix))
+    result.generation = np.zeros(len(result.vertices), dtype=np.int64)
+    result.generation[:nV] = np.where(fix, mesh.generation, 0)
+    return result
+
+def _sqrt3Step(he):
+    mesh = he.mesh
+    vertices = mesh.vertices
+    nV = mesh.numVertices()
+    facePoints = mesh.faceCenters()
+    fix = mesh.fix | he.isBoundaryVertex()
+
+    # vertex points
+    n = np.bincount(he.vertex, minlength=nV).astype(np.float64)
+    ring = _scatterAdd(he.vertex, vertices[he.vertex[he.next]], nV)
+    move = ~fix & (n > 0)
+    nm = n[move]
+    alpha = (4 - 2 * np.cos(2 * np.pi / nm)) / 9
+    vertexPoints = vertices.copy()
+    vertexPoints[move] = vertices[move] * (1 - alpha)[:, None] + ring[move] * (alpha / nm)[:, None]
+
+    # one triangle per half-edge: the flipped edge between the two
+    # face points, or the unflipped triangle at the boundary
+    halfEdges = np.arange(len(he.vertex))
+    twin = he.twin
+    inner = twin >= 0
+    faces = np.empty((len(halfEdges), 3), dtype=np.int64)
+    faces[:, 0] = he.vertex
+    faces[inner, 1] = nV + he.face[twin[inner]]
+    faces[inner, 2] = nV + he.face[inner]
+    faces[~inner, 1] = he.vertex[he.next[~inner]]
+    faces[~inner, 2] = nV + he.face[~inner]
+    result = ArrayMesh(np.concatenate((vertexPoints, facePoints)), faces)
+    _copyFaceProperties(mesh, result, 3)
+    result.fix = np.concatenate((fix, np.zeros(mesh.numFaces(), dtype=bool)))
+    result.generation = np.zeros(len(result.vertices), dtype=np.int64)
+    result.generation[:nV] = np.where(fix, mesh.generation, 0)
+    return result
+
+def _copyFaceProperties(mesh, result, n):
+    # every face of mesh was split into n consecutive faces of result
+    result.colors = np.repeat(mesh.colors, n, axis=0)
+    result.groups = [g for g in mesh.groups for i in range(n)]
+
+def shellArray(mesh, thickness=1.0, doClose=True):
+    """
+    Thickens an `ArrayMesh` to a shell, the array version of
+    `mola.subdivision.offset`. The vertices are moved by `thickness` along
+    their area weighted normals, summed in one scatter over all faces.
+    The faces of the result are the original faces, then the offset faces
+    (reversed), then one quad per boundary edge.
+
+    Arguments:
+    ----------
+    mesh : mola.arrayMesh.ArrayMesh
+        The mesh to be thickened
+    thickness : float
+        The offset distance, negative to offset against the normals, default 1
+    doClose : bool
+        Close the boundaries with side faces, default True
+    """
+    nV = mesh.numVertices()
+    nF = mesh.numFaces()
+    normals = vertexNormalsArray(mesh)
+    vertices = np.concatenate((mesh.vertices, mesh.vertices + normals * thickness))
+    # offset faces with reversed vertex order
+    corner = mesh.cornerFaces()
+    reverse = mesh.offsets[corner] + mesh.offsets[corner + 1] - 1 - np.arange(len(mesh.faces))
+    faces = [mesh.faces, nV + mesh.faces[reverse]]
+    sizes = [mesh.faceSizes(), mesh.faceSizes()]
+    sources = [np.arange(nF), np.arange(nF)]
+    if doClose:
+        nxt = _cornerNeighbours(mesh)[0]
+        he = HalfEdgeMesh(mesh)
+        boundary = np.nonzero(he.twin < 0)[0]
+        a = mesh.faces[boundary]
+        b = mesh.faces[nxt[boundary]]
+        faces.append(np.stack((b, a, nV + a, nV + b), axis=1).ravel())
+        sizes.append(np.full(len(boundary), 4, dtype=np.int64))
+        sources.append(corner[boundary])
+    sizes = np.concatenate(sizes)
+    offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    result = ArrayMesh(vertices, np.concatenate(faces), offsets)
+    source = np.concatenate(sources)
+    result.colors = mesh.colors[source]
+    result.groups = [mesh.groups[i] for i in source.tolist()]
+    result.fix = np.concatenate((mesh.fix, mesh.fix))
+    result.generation = np.concatenate((mesh.generation, mesh.generation))
+    return result
+
+def vertexNormalsArray(mesh):
+    """
+    Returns the (N,3) array of the unit vertex normals of an `ArrayMesh`,
+    the sum of the vector areas of the faces around each vertex.
+    Vertices without faces get a zero normal.
+    """
+    nxt = _cornerNeighbours(mesh)[0]
+    corner = mesh.cornerFaces()
+    points = mesh.vertices[mesh.faces]
+    # vector area of every face (Newell), valid for non planar n-gons
+    faceAreas = _scatterAdd(corner, np.cross(points, points[nxt]), mesh.numFaces()) * 0.5
+    normals = _scatterAdd(mesh.faces, faceAreas[corner], mesh.numVertices())
+    lengths = np.linalg.norm(normals, axis=1)
+    lengths[lengths == 0] = 1
+    return normals / lengths[:, None]
+
+def extrudeArray(mesh, heights=0.0, capBottom=False, capTop=True):
+    """
+    Extrudes every face of an `ArrayMesh` straight along its normal,
+    the batch version of `mola.subdivision.extrude`.
+    Parameters are single values or arrays with one value per face.
+
+    Arguments:
+    ----------
+    mesh : mola.arrayMesh.ArrayMesh
+        The mesh whose faces are extruded
+    heights : float or list
+        The extrusion distance, default 0
+    capBottom : bool or list
+        Keep the original face, default False
+    capTop : bool or list
+        Create the extrusion face, default True
+    """
+    nF = mesh.numFaces()
+    heights = _perFace(heights, nF, np.float64)
+    capBottom = _perFace(capBottom, nF, bool)
+    capTop = _perFace(capTop, nF, bool)
+    corner = mesh.cornerFaces()
+    tops = mesh.vertices[mesh.faces] + (mesh.faceNormals() * heights[:, None])[corner]
+    nV = mesh.numVertices()
+    sizes = mesh.faceSizes()
+    counts = capBottom + sizes + capTop
+    parts = _sideQuads(mesh, mesh.faces, nV + np.arange(len(mesh.faces)), capBottom)
+    parts.append(_capFaces(mesh, np.nonzero(capBottom)[0], 0, mesh.faces))
+    parts.append(_capFaces(mesh, np.nonzero(capTop)[0], capBottom + sizes, nV + np.arange(len(mesh.faces))))
+    return _emitFaces(mesh, tops, counts, parts)
+
+def extrudeTaperedArray(mesh, heights=0.0, fractions=0.5, doCaps=True):
+    """
+    Extrudes every face of an `ArrayMesh` tapered like a window, the batch
+    version of `mola.subdivision.extrudeTapered`.
+    Parameters are single values or arrays with one value per face.
+
+    Arguments:
+    ----------
+    mesh : mola.arrayMesh.ArrayMesh
+        The mesh whose faces are extruded
+    heights : float or list
+        The distance of the new face to the original face, default 0
+    fractions : float or list
+        The relative offset distance, 0: original vertex, 1: center point
+        default 0.5 (halfway)
+    doCaps : bool or list
+        Create the closing face, default True
+    """
+    nF = mesh.numFaces()
+    heights = _perFace(heights, nF, np.float64)
+    fractions = _perFace(fractions, nF, np.float64)
+    doCaps = _perFace(doCaps, nF, bool)
+    corner = mesh.cornerFaces()
+    points = mesh.vertices[mesh.faces]
+    tops = points + (mesh.faceCenters()[corner] - points) * fractions[corner][:, None]
+    tops += (mesh.faceNormals() * heights[:, None])[corner]
+    nV = mesh.numVertices()
+    sizes = mesh.faceSizes()
+    parts = _sideQuads(mesh, mesh.faces, nV + np.arange(len(mesh.faces)), np.zeros(nF, dtype=np.int64))
+    parts.append(_capFaces(mesh, np.nonzero(doCaps)[0], sizes, nV + np.arange(len(mesh.faces))))
+    return _emitFaces(mesh, tops, sizes + doCaps, parts)
+
+def splitRelArray(mesh, directions=0, splits=0.5):
+    """
+    Splits every quad of an `ArrayMesh` in two, the batch version of
+    `mola.subdivision.splitRel`. Other faces are kept.
+    Parameters are single values or arrays with one value per face.
+
+    Arguments:
+    ----------
+    mesh : mola.arrayMesh.ArrayMesh
+        The mesh whose faces are split
+    directions : int or list
+        The direction of the split (-1 or 0), default 0
+    splits : float or list
+        Position of the split relative to the face points (0 to 1), default 0.5
+    """
+    nF = mesh.numFaces()
+    directions = _perFace(directions, nF, np.int64)
+    splits = _perFace(splits, nF, np.float64)
+    sizes = mesh.faceSizes()
+    quads = np.nonzero(sizes == 4)[0]
+    others = np.nonzero(sizes != 4)[0]
+    start = mesh.offsets[quads]
+    d = directions[quads]
+    a0 = mesh.faces[start + d % 4]
+    a1 = mesh.faces[start + (d + 1) % 4]
+    b0 = mesh.faces[start + (d + 3) % 4]
+    b1 = mesh.faces[start + (d + 2) % 4]
+    s = splits[quads][:, None]
+    vertices = mesh.vertices
+    pointsA = (vertices[a1] - vertices[a0]) * s + vertices[a0]
+    pointsB = (vertices[b1] - vertices[b0]) * s + vertices[b0]
+    nV = mesh.numVertices()
+    pA = nV + np.arange(len(quads))
+    pB = pA + len(quads)
+    counts = np.ones(nF, dtype=np.int64)
+    counts[quads] = 2
+    parts = [_keptFaces(mesh, others),
+             (quads, np.zeros(len(quads), dtype=np.int64), np.stack((b0, pB, pA, a0), axis=1)),
+             (quads, np.ones(len(quads), dtype=np.int64), np.stack((pB, b1, a1, pA), axis=1))]
+    return _emitFaces(mesh, np.concatenate((pointsA, pointsB)), counts, parts)
+
+def splitFrameArray(mesh, widths):
+    """
+    Splits every face of an `ArrayMesh` into an offset frame with quad
+    corners and an inner face, the batch version of `mola.subdivision.splitFrame`.
+    Works only with convex faces.
+
+    Arguments:
+    ----------
+    mesh : mola.arrayMesh.ArrayMesh
+        The mesh whose faces are split
+    widths : float or list
+        The width of the offset frame, one value or one per face
+    """
+    nF = mesh.numFaces()
+    widths = _perFace(widths, nF, np.float64)
+    corner = mesh.cornerFaces()
+    nxt, prev = _cornerNeighbours(mesh)
+    faces = mesh.faces
+    vertices = mesh.vertices
+    vp = vertices[faces[prev]]
+    v = vertices[faces]
+    vn = vertices[faces[nxt]]
+    vnn = vertices[faces[nxt[nxt]]]
+    w = widths[corner][:, None]
+    w1 = w / np.sin(_angleTriangle(vp, v, vn))
+    w2 = w / np.sin(_angleTriangle(v, vn, vnn))
+    p1 = _betweenAbs(v, vn, w1)
+    p2 = _betweenAbs(vn, v, w2)
+    a = _betweenAbs(v, vp, w1)
+    b = _betweenAbs(vn, vnn, w2)
+    inner1 = _betweenAbs(a, b, w1)
+    inner2 = _betweenAbs(b, a, w2)
+    nC = len(mesh.faces)
+    nV = mesh.numVertices()
+    iP1, iP2, iA, iInner1, iInner2 = [nV + i * nC + np.arange(nC) for i in range(5)]
+    local = np.arange(nC) - mesh.offsets[corner]
+    parts = [(corner, 2 * local, np.stack((faces, iA, iInner1, iP1), axis=1)),
+             (corner, 2 * local + 1, np.stack((iP1, iInner1, iInner2, iP2), axis=1))]
+    sizes = mesh.faceSizes()
+    parts.append(_capFaces(mesh, np.arange(nF), 2 * sizes, iInner1))
+    return _emitFaces(mesh, np.concatenate((p1, p2, a, inner1, inner2)), 2 * sizes + 1, parts)
+
+def splitGridArray(mesh, nU, nV):
+    """
+    Splits every triangle and quad of an `ArrayMesh` into a regular grid,
+    the batch version of `mola.subdivision.splitGrid`. Other faces are kept.
+    The corners of the grids are the original vertices.
+
+    Arguments:
+    ----------
+    mesh : mola.arrayMesh.ArrayMesh
+        The mesh whose faces are split
+    nU, nV : int or list
+        The number of rows and columns, one value or one per face
+    """
+    nF = mesh.numFaces()
+    nU = _perFace(nU, nF, np.int64)
+    nV = _perFace(nV, nF, np.int64)
+    sizes = mesh.faceSizes()
+    counts = np.ones(nF, dtype=np.int64)
+    counts[sizes == 4] = (nU * nV)[sizes == 4]
+    counts[sizes == 3] = (nU * nV)[sizes == 3]
+    parts = [_keptFaces(mesh, np.nonzero((sizes != 3) & (sizes != 4))[0])]
+    points = [np.zeros((0, 3))]
+    nPoints = mesh.numVertices()
+    keys = np.stack((sizes, nU, nV), axis=1)
+    for size, u, v in np.unique(keys[(sizes == 3) | (sizes == 4)], axis=0).tolist():
+        faces = np.nonzero((sizes == size) & (nU == u) & (nV == v))[0]
+        corners = mesh.faces[mesh.offsets[faces][:, None] + np.arange(size)]
+        if size == 4:
+            grid, ids, faceIds = _gridQuads(mesh.vertices, corners, u, v, nPoints)
+        else:
+            grid, ids, faceIds = _gridTriangles(mesh.vertices, corners, u, v, nPoints)
+        points.append(grid)
+        nPoints += len(grid)
+        # triangle grids start with a row of triangles
+        for faceSize in set(len(f) for f in faceIds):
+            rows = [i for i, f in enumerate(faceIds) if len(f) == faceSize]
+            parts.append((np.repeat(faces, len(rows)), np.tile(np.array(rows), len(faces)),
+                          ids[:, [faceIds[i] for i in rows]].reshape(-1, faceSize)))
+    return _emitFaces(mesh, np.concatenate(points), counts, parts)
+
+def _gridQuads(vertices, corners, nU, nV, start):
+    # the grid points of K quads as (K, nU+1, nV+1) vertex ids, interior
+    # and edge points are new, numbered from start
+    p = vertices[corners]
+    u = np.arange(nU + 1)[None, :, None]
+    rowsA = p[:, 0][:, None] + (p[:, 1] - p[:, 0])[:, None] / nU * u
+    rowsB = p[:, 3][:, None] + (p[:, 2] - p[:, 3])[:, None] / nU * u
+    v = np.arange(nV + 1)[None, None, :, None]
+    grid = rowsA[:, :, None] + ((rowsB - rowsA) / nV)[:, :, None] * v
+    ids = start + np.arange(grid.shape[0] * grid.shape[1] * grid.shape[2]).reshape(grid.shape[:3])
+    ids[:, 0, 0] = corners[:, 0]
+    ids[:, nU, 0] = corners[:, 1]
+    ids[:, nU, nV] = corners[:, 2]
+    ids[:, 0, nV] = corners[:, 3]
+    ids = ids.reshape(len(corners), -1)
+    faceIds = []
+    for i in range(nU):
+        for j in range(nV):
+            a = i * (nV + 1) + j
+            faceIds.append([a, a + nV + 1, a + nV + 2, a + 1])
+    return grid.reshape(-1, 3), ids, faceIds
+
+def _gridTriangles(vertices, corners, nU, nV, start):
+    # row u of the grid runs from the edge 0-1 to the edge 0-2,
+    # the first row of faces are triangles at corner 0
+    p = vertices[corners]
+    u = np.arange(1, nU + 1)[None, :, None]
+    rowsA = p[:, 0][:, None] + (p[:, 1] - p[:, 0])[:, None] / nU * u
+    rowsB = p[:, 0][:, None] + (p[:, 2] - p[:, 0])[:, None] / nU * u
+    v = np.arange(nV + 1)[None, None, :, None]
+    grid = rowsA[:, :, None] + ((rowsB - rowsA) / nV)[:, :, None] * v
+    ids = start + np.arange(grid.shape[0] * grid.shape[1] * grid.shape[2]).reshape(grid.shape[:3])
+    ids[:, nU - 1, 0] = corners[:, 1]
+    ids[:, nU - 1, nV] = corners[:, 2]
+    # the first column holds corner 0
+    ids = np.concatenate((corners[:, :1], ids.reshape(len(corners), -1)), axis=1)
+    faceIds = [[0, 1 + j, 2 + j] for j in range(nV)]
+    for i in range(nU - 1):
+        for j in range(nV):
+            a = 1 + i * (nV + 1) + j
+            faceIds.append([a, a + 1, a + nV + 2, a + nV + 1])
+    return grid.reshape(-1, 3), ids, faceIds
+
+def _perFace(values, nFaces, dtype):
+    # one value per face from a single value or a list
+    return np.broadcast_to(np.asarray(values, dtype=dtype), (nFaces,)).astype(dtype)
+
+def _angleTriangle(vPrevious, v, vNext):
+    # vec.angleTriangle, law of cosines
+    vvn = np.linalg.norm(vNext - v, axis=1)
+    vvp = np.linalg.norm(v - vPrevious, axis=1)
+    vnvp = np.linalg.norm(vPrevious - vNext, axis=1)
+    return np.arccos((vvn * vvn + vvp * vvp - vnvp * vnvp) / (2 * vvn * vvp))[:, None]
+
+def _betweenAbs(v1, v2, distance):
+    # vec.betweenAbs
+    return (v2 - v1) * (distance / np.linalg.norm(v2 - v1, axis=1)[:, None]) + v1
+
+def _sideQuads(mesh, bottom, top, local):
+    # one quad per corner between the bottom and the top vertices,
+    # local is the position of the first quad in the faces of each face
+    corner = mesh.cornerFaces()
+    nxt, prev = _cornerNeighbours(mesh)
+    position = local[corner] + np.arange(len(mesh.faces)) - mesh.offsets[corner]
+    return [(corner, position, np.stack((bottom, bottom[nxt], top[nxt], top), axis=1))]
+
+def _cornerNeighbours(mesh):
+    # the next and previous corner of every corner in its face
+    corners = np.arange(len(mesh.faces))
+    nxt = corners + 1
+    nxt[mesh.offsets[1:] - 1] = mesh.offsets[:-1]
+    prev = corners - 1
+    prev[mesh.offsets[:-1]] = mesh.offsets[1:] - 1
+    return nxt, prev
+
+def _capFaces(mesh, faces, local, indices):
+    # faces with the corners of the given faces, taken from indices
+    f, c = _faceCorners(mesh, faces)
+    local = np.broadcast_to(local, (mesh.numFaces(),))
+    return (faces, local[faces], indices[c], mesh.faceSizes()[faces])
+
+def _keptFaces(mesh, faces):
+    # unchanged faces
+    return _capFaces(mesh, faces, 0, mesh.faces)
+
+def _emitFaces(mesh, newVertices, counts, parts):
+    # writes the faces of all parts into a preallocated mesh, the original
+    # vertices first, followed by newVertices. counts is the number of new
+    # faces of each face, a part is (face, local index, vertex ids) for
+    # faces of equal size or (face, local index, flat vertex ids, sizes)
+    nF = mesh.numFaces()
+    counts = np.asarray(counts, dtype=np.int64)
+    faceStart = np.cumsum(counts) - counts
+    nOut = int(counts.sum())
+    sizes = np.zeros(nOut, dtype=np.int64)
+    parts = [part if len(part) == 4 else (part[0], part[1], part[2].ravel(),
+                                          np.full(len(part[0]), part[2].shape[1], dtype=np.int64))
+             for part in parts]
+    for source, local, ids, partSizes in parts:
+        sizes[faceStart[source] + local] = partSizes
+    offsets = np.zeros(nOut + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    faces = np.empty(offsets[-1], dtype=np.int64)
+    for source, local, ids, partSizes in parts:
+        target = offsets[faceStart[source] + local]
+        entry = np.repeat(np.arange(len(partSizes)), partSizes)
+        inner = np.arange(len(ids)) - np.repeat(np.cumsum(partSizes) - partSizes, partSizes)
+        faces[target[entry] + inner] = ids
+    nV = mesh.numVertices()
+    result = ArrayMesh(np.concatenate((mesh.vertices, newVertices)), faces, offsets)
+    source = np.repeat(np.arange(nF), counts)
+    result.colors = mesh.colors[source]
+    result.groups = [mesh.groups[i] for i in source.tolist()]
+    result.fix[:nV] = mesh.fix
+    result.generation[:nV] = mesh.generation
+    return result
+
+class StencilMatrix:
+    """A `StencilMatrix` is a sparse matrix in compressed sparse row (CSR) layout,
+    row `i` computes one refined point as the weighted sum of the points
+    `indices[indptr[i]:indptr[i+1]]` with `weights[indptr[i]:indptr[i+1]]`.
+    Products use scipy if it is installed, NumPy otherwise.
+
+    Attributes
+    ----------
+    indptr : numpy.ndarray
+        The (R+1,) int64 array of start positions of each row.
+    indices : numpy.ndarray
+        The int64 array of the column of every entry.
+    weights : numpy.ndarray
+        The float64 array of the weight of every entry.
+    shape : tuple
+        The number of rows and columns.
+    """
+    def __init__(self, indptr, indices, weights, shape):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.shape = tuple(shape)
+        self._rows = np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+        self._csr = None
+
+    @classmethod
+    def fromTriplets(cls, rows, cols, weights, shape):
+        """
+        Creates a `StencilMatrix` from (row, column, weight) entries,
+        weights of repeated entries are summed.
+        """
+        keys = np.asarray(rows, dtype=np.int64) * shape[1] + np.asarray(cols, dtype=np.int64)
+        keys, inverse = np.unique(keys, return_inverse=True)
+        weights = np.bincount(inverse.ravel(), weights=weights, minlength=len(keys))
+        rows = keys // shape[1]
+        indptr = np.zeros(shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=shape[0]), out=indptr[1:])
+        return cls(indptr, keys % shape[1], weights, shape)
+
+    @classmethod
+    def identity(cls, n):
+        """
+        Returns the n x n identity matrix.
+        """
+        return cls(np.arange(n + 1), np.arange(n), np.ones(n), (n, n))
+
+    def dot(self, points):
+        """
+        Returns the product of this matrix and a (C,k) or (C,) array of points.
+        """
+        points = np.asarray(points, dtype=np.float64)
+        if _sparse is not None:
+            return self.toScipy().dot(points)
+        values = points[self.indices]
+        if points.ndim == 1:
+            return np.bincount(self._rows, weights=values * self.weights, minlength=self.shape[0])
+        values *= self.weights[:, None]
+        result = np.empty((self.shape[0],) + points.shape[1:])
+        for i in range(points.shape[1]):
+            result[:, i] = np.bincount(self._rows, weights=values[:, i], minlength=self.shape[0])
+        return result
+
+    def multiply(self, other, chunkSize=1 << 22):
+        """
+        Returns the matrix product of this matrix and another `StencilMatrix`.
+        The rows are multiplied in chunks of about `chunkSize` intermediate
+        entries to bound the memory.
+        """
+        if _sparse is not None:
+            product = self.toScipy().dot(other.toScipy()).tocsr()
+            product.sum_duplicates()
+            return StencilMatrix(product.indptr, product.indices, product.data, product.shape)
+        counts = np.diff(other.indptr)[self.indices]
+        # number of intermediate entries up to the end of each row
+        rowEnds = np.cumsum(np.bincount(self._rows, weights=counts, minlength=self.shape[0]))
+        chunks = []
+        start = 0
+        while start < self.shape[0]:
+            done = rowEnds[start - 1] if start > 0 else 0
+            end = int(np.searchsorted(rowEnds, done + chunkSize, 'right'))
+            end = min(max(end, start + 1), self.shape[0])
+            entries = np.arange(self.indptr[start], self.indptr[end])
+            chunks.append(self._multiplyRows(other, start, end, entries, counts[entries]))
+            start = end
+        if not chunks:
+            return StencilMatrix(np.zeros(1), [], [], (0, other.shape[1]))
+        indptr = np.zeros(self.shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.concatenate([np.diff(c.indptr) for c in chunks]), out=indptr[1:])
+        return StencilMatrix(indptr, np.concatenate([c.indices for c in chunks]),
+                             np.concatenate([c.weights for c in chunks]), (self.shape[0], other.shape[1]))
+
+    def _multiplyRows(self, other, start, end, entries, counts):
+        # every entry (i,k) of self meets every entry (k,j) of other,
+        # returns the rows start to end of the product
+        total = int(counts.sum())
+        entry = np.repeat(entries, counts)
+        starts = np.repeat(np.cumsum(counts) - counts, counts)
+        positions = other.indptr[self.indices[entry]] + np.arange(total) - starts
+        return StencilMatrix.fromTriplets(self._rows[entry] - start, other.indices[positions],
+                                          self.weights[entry] * other.weights[positions],
+                                          (end - start, other.shape[1]))
+
+    def toScipy(self):
+        """
+        Returns the matrix as a `scipy.sparse.csr_matrix` (requires scipy).
+        """
+        if self._csr is None:
+            from scipy.sparse import csr_matrix
+            self._csr = csr_matrix((self.weights, self.indices, self.indptr), shape=self.shape)
+        return self._csr
+
+class SubdivisionStencil:
+    """A `SubdivisionStencil` compiles the topology of a control cage into
+    sparse Catmull-Clark stencils for a number of levels. The refined
+    positions of a deformed cage (same faces, moved vertices) are then one
+    sparse matrix product, instead of a new subdivision per frame.
+
+    Attributes
+    ----------
+    cage : mola.arrayMesh.ArrayMesh
+        The control cage the stencil was compiled from.
+    mesh : mola.arrayMesh.ArrayMesh
+        The refined mesh of the cage, as returned by `subdivideCatmullArray`.
+    matrices : list
+        The `StencilMatrix` of every level.
+    matrix : StencilMatrix
+        The stencil of all levels, from cage vertices to refined vertices.
+    """
+    def __init__(self, cage, levels=1):
+        self.cage = cage
+        self.matrices = []
+        mesh = cage
+        for level in range(levels):
+            he = HalfEdgeMesh(mesh)
+            self.matrices.append(_catmullStencil(he))
+            mesh = _catmullStep(he)
+        self.mesh = mesh
+        self.matrix = StencilMatrix.identity(cage.numVertices())
+        # the stencil from the face points of the first level to the refined vertices
+        self._faceMatrix = None
+        for i, matrix in enumerate(self.matrices):
+            self.matrix = matrix.multiply(self.matrix)
+            if i > 0:
+                self._faceMatrix = matrix.multiply(self._faceMatrix)
+            else:
+                self._faceMatrix = _selectColumns(StencilMatrix.identity(matrix.shape[0]),
+                                                  matrix.shape[0] - cage.numFaces())
+
+    def evaluate(self, positions, offsets=None):
+        """
+        Returns the (N,3) array of refined vertex positions.
+
+        Arguments:
+        ----------
+        positions : numpy.ndarray
+            The (V,3) array of new positions of the cage vertices
+        offsets : list
+            Optional, for every cage face a distance to move its face point
+            along the face normal, like `subdivide_catmull_translate_facevertices`
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        result = self.matrix.dot(positions)
+        if offsets is not None:
+            cage = ArrayMesh(positions, self.cage.faces, self.cage.offsets)
+            offsets = np.asarray(offsets, dtype=np.float64)
+            result += self._faceMatrix.dot(cage.faceNormals() * offsets[:, None])
+        return result
+
+    def getMesh(self, positions, offsets=None):
+        """
+        Returns a copy of the refined mesh with the vertex positions
+        of `evaluate(positions, offsets)`.
+        """
+        mesh = self.mesh.copy()
+        mesh.vertices = self.evaluate(positions, offsets)
+        return mesh
+
+def _catmullStencil(he):
+    # the weights of _catmullStep as a sparse matrix
+    mesh = he.mesh
+    nV = mesh.numVertices()
+    nE = he.numEdges()
+    nF = mesh.numFaces()
+    sizes = mesh.faceSizes().astype(np.float64)
+    rows = []
+    cols = []
+    weights = []
+
+    # face points
+    corners = np.arange(len(mesh.faces))
+    rows.append(nV + nE + he.face)
+    cols.append(he.vertex)
+    weights.append(1.0 / sizes[he.face])
+
+    # edge points
+    h = he.edgeHalfEdge
+    t = he.twin[h]
+    inner = t >= 0
+    edgeRows = nV + np.arange(nE)
+    edgeWeights = np.where(inner, 0.25, 0.5)
+    rows.extend((edgeRows, edgeRows))
+    cols.extend((he.vertex[h], he.vertex[he.next[h]]))
+    weights.extend((edgeWeights, edgeWeights))
+    for side in (h[inner], t[inner]):
+        f, c = _faceCorners(mesh, he.face[side])
+        rows.append(nV + he.edge[side][f])
+        cols.append(mesh.faces[c])
+        weights.append(0.25 / sizes[he.face[side]][f])
+
+    # vertex points
+    fix = mesh.fix | he.isBoundaryVertex()
+    n = np.bincount(he.vertex, minlength=nV).astype(np.float64)
+    move = ~fix & (n > 0)
+    vertexWeights = np.ones(nV)
+    vertexWeights[move] = (n[move] - 2) / n[move]
+    rows.append(np.arange(nV))
+    cols.append(np.arange(nV))
+    weights.append(vertexWeights)
+    out = corners[move[he.vertex]]
+    nOut = n[he.vertex[out]]
+    rows.append(he.vertex[out])
+    cols.append(he.vertex[he.next[out]])
+    weights.append(1.0 / (nOut * nOut))
+    f, c = _faceCorners(mesh, he.face[out])
+    rows.append(he.vertex[out][f])
+    cols.append(mesh.faces[c])
+    weights.append(1.0 / (nOut * nOut * sizes[he.face[out]])[f])
+
+    return StencilMatrix.fromTriplets(np.concatenate(rows), np.concatenate(cols),
+                                      np.concatenate(weights), (nV + nE + nF, nV))
+
+def _faceCorners(mesh, faces):
+    # expands a list of faces to all their corners, returns for every corner
+    # the position in the list and the index into mesh.faces
+    counts = np.diff(mesh.offsets)[faces]
+    entry = np.repeat(np.arange(len(faces)), counts)
+    starts = np.cumsum(counts) - counts
+    return entry, mesh.offsets[faces][entry] + np.arange(int(counts.sum())) - starts[entry]
+
+def _selectColumns(matrix, start):
+    # keeps the columns from start on
+    keep = matrix.indices >= start
+    return StencilMatrix.fromTriplets(matrix._rows[keep], matrix.indices[keep] - start,
+                                      matrix.weights[keep], (matrix.shape[0], matrix.shape[1] - start))
+
+def _scatterAdd(indices, values, n):
+    # sums the rows of values per index, faster than np.add.at
+    result = np.empty((n, values.shape[1]))
+    for i in range(values.shape[1]):
+        result[:, i] = np.bincount(indices, weights=values[:, i], minlength=n)
+    return result
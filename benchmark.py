@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmarks, run with `python -m mola.benchmark`.
+"""
+
+__author__     = ['Benjamin Dillenburger','Demetris Shammas','Mathias Bernhard']
+__copyright__  = 'Copyright 2019 / Digital Building Technologies DBT / ETH Zurich'
+__license__    = 'MIT License'
+__email__      = ['<dbt@arch.ethz.ch>']
+
+import os
+import time
+import tracemalloc
+from mola.core import Mesh
+from mola.core import Vertex
+from mola.core import Face
+from mola.core import SlotVertex
+from mola.core import SlotFace
+
+def _timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+def _gridMesh(n, vertexClass, faceClass):
+    mesh = Mesh()
+    mesh.vertices = [vertexClass(x, y, 0) for x in range(n) for y in range(n)]
+    vs = mesh.vertices
+    for x in range(n - 1):
+        for y in range(n - 1):
+            i = x * n + y
+            mesh.faces.append(faceClass([vs[i], vs[i + n], vs[i + n + 1], vs[i + 1]]))
+    mesh.updateAdjacencies()
+    return mesh
+
+def benchmarkSlots(n=1000):
+    """
+    Compares memory and attribute access of a quad grid mesh with n x n vertices
+    made of `Vertex`/`Face`/`Edge` and `SlotVertex`/`SlotFace`/`SlotEdge` objects.
+    """
+    print('slots: mesh with %d vertices' % (n * n))
+    for vertexClass, faceClass in [(Vertex, Face), (SlotVertex, SlotFace)]:
+        tracemalloc.start()
+        mesh, tCreate = _timed(lambda: _gridMesh(n, vertexClass, faceClass))
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        def access():
+            s = 0
+            for v in mesh.vertices:
+                s += v.x + v.y + v.z
+                v.generation = 1
+            for e in mesh.edges:
+                s += e.v1.x
+            return s
+        _, tAccess = _timed(access)
+        print('  %-10s %7.1f MB  %5.0f bytes/vertex  create %.2f s  access %.2f s' % (
+            vertexClass.__name__, memory / 1e6, memory / (n * n), tCreate, tAccess))
+        del mesh
+
+def benchmarkParallelMarchingCubes(n=256, workers=(1, 2, 4, 8)):
+    """
+    Compares the time of `marchingCubesArray` and `marchingCubesParallel`
+    with different numbers of workers on a n x n x n field.
+    """
+    import numpy as np
+    from mola.arrayMarchingCubes import marchingCubesArray
+    from mola.arrayMarchingCubes import marchingCubesParallel
+    x, y, z = np.mgrid[0:n, 0:n, 0:n]
+    values = np.sin(x * 0.1) + np.sin(y * 0.13) + np.sin(z * 0.17)
+    print('parallel marching cubes: %d^3 values, %d cpus' % (n, os.cpu_count()))
+    mesh, tSerial = _timed(lambda: marchingCubesArray(n, n, n, values, 0.5))
+    print('  serial      %6.2f s  %d triangles' % (tSerial, mesh.numFaces()))
+    for w in workers:
+        mesh, t = _timed(lambda: marchingCubesParallel(n, n, n, values, 0.5, w))
+        print('  %2d workers  %6.2f s  speedup %.2f' % (w, t, tSerial / t))
+
+if __name__ == '__main__':
+    benchmarkSlots()
+    benchmarkParallelMarchingCubes()
@@ -118,7 +118,8 @@ def colorFacesByCurvature(faces):
     Assigns a color to all the faces by curvature (require topological meshinformation),
     from smallest (red) to biggest (purple).
     """
-    colorFacesByFunction(faces, faceUtils.curvature)
+    # the cache computes the normal of every face only once
+    colorFacesByFunction(faces, faceUtils.FaceGeometry(faces).curvature)
 
 def colorFacesByArea(faces):
     """
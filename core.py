@@ -7,27 +7,11 @@ __email__      = ['<dbt@arch.ethz.ch>']
 
 import math
 
-class Vertex:
-    """A vertex defines a point in space.
-
-    Attributes
-    ----------
-    x, y, z : float
-        The coordinates of the `Vertex`.
-    fix : boolean
-        Flag to set a Vertex to be fixed or not.
-    generation : integer
-        Number in what generation of subdivision the face was created.
-    edges : list
-        List of edges connected to the `Vertex`.
+class _VertexBase(object):
     """
-    def __init__(self, x=0, y=0, z=0):
-        self.x = x
-        self.y = y
-        self.z = z
-        self.fix = False
-        self.generation = 0
-        self.edges = []
+    Methods shared by `Vertex` and `SlotVertex`.
+    """
+    __slots__ = ()
 
     def __str__(self):
         """
@@ -42,7 +26,7 @@ class Vertex:
         """
         Compares this `Vertex` to another `Vertex`. Returns true if all their 3 coordinates are equal.
         """
-        if isinstance(other, self.__class__):
+        if isinstance(other, _VertexBase):
             return (self.x == other.x) and (self.y == other.y) and (self.z == other.z)
         else:
             return False
@@ -118,28 +102,76 @@ class Vertex:
         return self.divide(l)
 
     def __add__(self, other):
-        vector = Vertex(self.x, self.y, self.z)
+        vector = self.__class__(self.x, self.y, self.z)
         return vector.add(other)
 
     def __sub__(self, other):
-        vector = Vertex(self.x, self.y, self.z)
+        vector = self.__class__(self.x, self.y, self.z)
         return vector.subtract(other)
 
     def __mul__(self, factor):
-        vector = Vertex(self.x, self.y, self.z)
+        vector = self.__class__(self.x, self.y, self.z)
         return vector.scale(factor)
 
     # for python 3
     def __truediv__(self, factor):
-        vector = Vertex(self.x, self.y, self.z)
+        vector = self.__class__(self.x, self.y, self.z)
         return vector.divide(factor)
 
     # for python 2
     def __div__(self, factor):
-        vector = Vertex(self.x, self.y, self.z)
+        vector = self.__class__(self.x, self.y, self.z)
         return vector.divide(factor)
 
 
+class Vertex(_VertexBase):
+    """A vertex defines a point in space.
+
+    Attributes
+    ----------
+    x, y, z : float
+        The coordinates of the `Vertex`.
+    fix : boolean
+        Flag to set a Vertex to be fixed or not.
+    generation : integer
+        Number in what generation of subdivision the face was created.
+    edges : list
+        List of edges connected to the `Vertex`.
+    """
+    def __init__(self, x=0, y=0, z=0):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.fix = False
+        self.generation = 0
+        self.edges = []
+
+class SlotVertex(_VertexBase):
+    """A `Vertex` with `__slots__` instead of an instance dictionary,
+    it uses less memory but does not accept attributes outside of its slots.
+
+    Attributes
+    ----------
+    x, y, z, fix, generation, edges
+        see `Vertex`
+    vertex : mola.core.SlotVertex
+        Scratch slot for the new position calculated by subdivision.
+    nfaces : integer
+        Scratch slot for the number of adjacent faces counted by subdivision.
+    """
+    __slots__ = ('x', 'y', 'z', 'fix', 'generation', 'edges', 'vertex', 'nfaces')
+
+    def __init__(self, x=0, y=0, z=0):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.fix = False
+        self.generation = 0
+        self.edges = []
+        self.vertex = None
+        self.nfaces = 0
+
+
 class Face:
     """A `Face` is the surface between a set of vertices.
 
@@ -161,12 +193,32 @@ class Face:
         self.color = (1,1,1,1)
         self.group = 0
 
-class Edge:
-    def __init__(self, v1, v2):
-        self.v1 = v1
-        self.v2 = v2
-        self.face1 = None
-        self.face2 = None
+class SlotFace(object):
+    """A `Face` with `__slots__` instead of an instance dictionary.
+
+    Attributes
+    ----------
+    vertices, color, group
+        see `Face`
+    vertex : mola.core.SlotVertex
+        Scratch slot for the face point calculated by subdivision.
+    """
+    __slots__ = ('vertices', 'color', 'group', 'vertex')
+
+    def __init__(self, vertices=None):
+        if (vertices == None):
+            self.vertices = []
+        else:
+            self.vertices = vertices
+        self.color = (1,1,1,1)
+        self.group = 0
+        self.vertex = None
+
+class _EdgeBase(object):
+    """
+    Methods shared by `Edge` and `SlotEdge`.
+    """
+    __slots__ = ()
 
     def __str__(self):
         return "from " + str(self.v1)+" to "+ str(self.v2)
@@ -186,7 +238,44 @@ class Edge:
         """
         returns the midpoint on an edge
         """
-        return Vertex((self.v2.x+self.v1.x)/2.0,(self.v2.y+self.v1.y)/2.0,(self.v2.z+self.v1.z)/2.0)
+        return self.v1.__class__((self.v2.x+self.v1.x)/2.0,(self.v2.y+self.v1.y)/2.0,(self.v2.z+self.v1.z)/2.0)
+
+class Edge(_EdgeBase):
+    """An `Edge` connects two vertices and the faces on both of its sides.
+
+    Attributes
+    ----------
+    v1, v2 : mola.core.Vertex
+        The start and end vertex.
+    face1 : mola.core.Face
+        The face along the edge from v1 to v2.
+    face2 : mola.core.Face
+        The face along the edge from v2 to v1.
+    """
+    def __init__(self, v1, v2):
+        self.v1 = v1
+        self.v2 = v2
+        self.face1 = None
+        self.face2 = None
+
+class SlotEdge(_EdgeBase):
+    """An `Edge` with `__slots__` instead of an instance dictionary.
+
+    Attributes
+    ----------
+    v1, v2, face1, face2
+        see `Edge`
+    vertex : mola.core.SlotVertex
+        Scratch slot for the edge point calculated by subdivision.
+    """
+    __slots__ = ('v1', 'v2', 'face1', 'face2', 'vertex')
+
+    def __init__(self, v1, v2):
+        self.v1 = v1
+        self.v2 = v2
+        self.face1 = None
+        self.face2 = None
+        self.vertex = None
 
 class Box:
     """A `Box` is defined by by two opposite corners with x,y,z coordinates.
@@ -266,11 +355,35 @@ class Mesh:
         The list of `Face` objects in the mesh.
     edges : list
         The list of edges in the mesh.
+    edgeDict : dict
+        The edges in the mesh, keyed by the unordered pair of their vertices (see `edgeKey`).
+    geometry : mola.faceUtils.FaceGeometry
+        The cached face normals, centers, areas and perimeters, `None` until `getGeometry` is called.
     """
     def __init__(self):
         self.vertices = []
         self.faces = []
         self.edges = []
+        self.edgeDict = {}
+        self.geometry = None
+
+    def getGeometry(self):
+        """
+        Returns the `FaceGeometry` cache of this mesh, created on the first call.
+        It is invalidated by `translate`, `scale` and `updateAdjacencies`,
+        call `invalidateGeometry` after moving vertices otherwise.
+        """
+        if self.geometry is None:
+            from mola.faceUtils import FaceGeometry
+            self.geometry = FaceGeometry(self)
+        return self.geometry
+
+    def invalidateGeometry(self):
+        """
+        Clears the cached face geometry, if any.
+        """
+        if getattr(self, 'geometry', None) is not None:
+            self.geometry.invalidate()
 
     def scale(self, sx, sy, sz):
         #vs = Vertex(sx, sy, sz)
@@ -278,6 +391,7 @@ class Mesh:
             v.x *= sx
             v.y *= sy
             v.z *= sz
+        self.invalidateGeometry()
 
     def translate(self, tx, ty, tz):
         """
@@ -287,6 +401,7 @@ class Mesh:
         vt = Vertex(tx, ty, tz)
         for v in self.vertices:
             v.add(vt)
+        self.invalidateGeometry()
 
     def getBounds(self):
         """
@@ -299,15 +414,20 @@ class Mesh:
         return box
 
     def getEdgeAdjacentToVertices(self,v1,v2):
-        for edge in v1.edges:
-            if edge.v2 == v2 or edge.v1 == v2:
-                return edge
-        return None
+        """
+        Returns the edge connecting the vertices v1 and v2 or `None` if there's none.
+        Constant time lookup in `edgeDict`, which is built by `updateAdjacencies`.
+        """
+        return self.edgeDict.get(edgeKey(v1,v2))
 
     def getFaceAdjacentToVertices(self,vertex1,vertex2):
-        edge = vertex1.getEdgeAdjacentToVertex(vertex2)
+        """
+        Returns the face on the side of the edge from vertex1 to vertex2
+        or `None` if there's none.
+        """
+        edge = self.getEdgeAdjacentToVertices(vertex1,vertex2)
         if edge != None:
-            if edge.v1 == vertex1:
+            if edge.v1 is vertex1:
                 return edge.face1
             else:
                 return edge.face2
@@ -323,34 +443,71 @@ class Mesh:
         self.faces.append(f)
         return f
 
-    def weldVertices(self):
+    def weldVertices(self,epsilon=0):
+        """
+        Merges the vertices of the faces with equal coordinates,
+        the vertex list is replaced by the vertices used by faces.
+        With `epsilon` > 0, vertices are hashed to the cells of a grid with
+        spacing `epsilon`, vertices in the same cell are merged and so are
+        vertices closer than `epsilon` in neighbouring cells. This removes
+        duplicates caused by floating point noise.
+
+        Arguments:
+        ----------
+        epsilon : float
+            The welding tolerance, default 0 (exact)
+
+        Returns:
+        --------
+        list of int
+            For each vertex of the previous vertex list the index of its
+            welded vertex in the new vertex list, -1 if it is not used by any face.
+        """
+        oldVertices = self.vertices
         weldedVertices = {}
-        self.vertices = []
+        vertices = []
+        indices = {}
         for f in self.faces:
             for i in range(len(f.vertices)):
                 v = f.vertices[i]
-                vtuple = (v.x, v.y, v.z)
-                if vtuple in weldedVertices:
-                    f.vertices[i] = weldedVertices[vtuple]
-                else:
+                vtuple = vertexKey(v,epsilon)
+                welded = weldedVertices.get(vtuple)
+                if welded is None and epsilon > 0:
+                    welded = _weldNeighbour(weldedVertices,vtuple,v,epsilon)
+                if welded is None:
+                    welded = v
                     weldedVertices[vtuple] = v
-        self.vertices = weldedVertices.values()
+                    indices[id(v)] = len(vertices)
+                    vertices.append(v)
+                else:
+                    f.vertices[i] = welded
+                    indices[id(v)] = indices[id(welded)]
+        self.vertices = vertices
+        return [indices.get(id(v), -1) for v in oldVertices]
 
     def updateAdjacencies(self):
         self.weldVertices()
+        self.invalidateGeometry()
         self.edges = []
+        self.edgeDict = {}
+        edgeDict = self.edgeDict
+        edgeClass = Edge
         for v in self.vertices:
             v.edges = []
+            if isinstance(v, SlotVertex):
+                edgeClass = SlotEdge
         for f in self.faces:
             v1 = f.vertices[-1]
             for v2 in f.vertices:
-                edge = v1.getEdgeAdjacentToVertex(v2)
+                key = edgeKey(v1,v2)
+                edge = edgeDict.get(key)
                 if edge == None:
-                    edge = Edge(v1,v2)
+                    edge = edgeClass(v1,v2)
                     v1.edges.append(edge)
                     v2.edges.append(edge)
                     self.edges.append(edge)
-                if edge.v1 == v1:
+                    edgeDict[key] = edge
+                if edge.v1 is v1:
                     edge.face1 = f
                 else:
                     edge.face2 = f
@@ -359,3 +516,68 @@ class Mesh:
     def constructTopology(self):
         self.weldVertices()
         self.updateAdjacencies()
+
+def slotMesh(mesh):
+    """
+    Returns a copy of the mesh made of `SlotVertex` and `SlotFace` objects,
+    use `updateAdjacencies` to create `SlotEdge` topology.
+
+    Arguments:
+    ----------
+    mesh : mola.core.Mesh
+        The mesh to be copied
+    """
+    newMesh = Mesh()
+    vertexMap = {}
+    for v in mesh.vertices:
+        vertexMap[id(v)] = _slotVertex(v)
+    for f in mesh.faces:
+        vertices = []
+        for v in f.vertices:
+            if id(v) not in vertexMap:
+                vertexMap[id(v)] = _slotVertex(v)
+            vertices.append(vertexMap[id(v)])
+        newFace = SlotFace(vertices)
+        newFace.color = f.color
+        newFace.group = f.group
+        newMesh.faces.append(newFace)
+    newMesh.vertices = list(vertexMap.values())
+    return newMesh
+
+def _slotVertex(v):
+    sv = SlotVertex(v.x, v.y, v.z)
+    sv.fix = v.fix
+    sv.generation = v.generation
+    return sv
+
+def _weldNeighbour(weldedVertices,key,v,epsilon):
+    # first vertex closer than epsilon in the 26 neighbour cells of key
+    x,y,z = key
+    for dx in (-1,0,1):
+        for dy in (-1,0,1):
+            for dz in (-1,0,1):
+                other = weldedVertices.get((x+dx,y+dy,z+dz))
+                if other is not None and (other.x-v.x)**2+(other.y-v.y)**2+(other.z-v.z)**2 <= epsilon*epsilon:
+                    return other
+    return None
+
+def vertexKey(v,epsilon=0):
+    """
+    Returns a hashable key of the position of a vertex, the coordinates
+    or with `epsilon` > 0 the cell of a grid with spacing `epsilon`
+    which is nearest to the vertex.
+    """
+    if epsilon > 0:
+        return (int(round(v.x / epsilon)), int(round(v.y / epsilon)), int(round(v.z / epsilon)))
+    return (v.x, v.y, v.z)
+
+def edgeKey(v1,v2):
+    """
+    Returns a hashable key for the unordered pair of vertices v1 and v2,
+    based on object identity (`Vertex` is not hashable as it defines `__eq__`).
+    """
+    i1 = id(v1)
+    i2 = id(v2)
+    if i1 < i2:
+        return (i1,i2)
+    return (i2,i1)
@@ -8,6 +8,11 @@ __email__      = ['<dbt@arch.ethz.ch>']
 import math
 from mola import vec
 from mola.core import Vertex
+# numpy is optional, `FaceGeometry` falls back to lists without it
+try:
+    import numpy as _np
+except ImportError:
+    _np = None
 
 def area(face):
     """
@@ -174,7 +179,7 @@ def centerFromVertices(vertices):
     cx = sum([v.x for v in vertices]) / n
     cy = sum([v.y for v in vertices]) / n
     cz = sum([v.z for v in vertices]) / n
-    return Vertex(cx,cy,cz)
+    return vertices[0].__class__(cx,cy,cz)
 
 def centerFromLine(v1,v2):
     """
@@ -190,7 +195,7 @@ def centerFromLine(v1,v2):
     mola.core.Vertex
         the center point of the line
     """
-    return Vertex((v1.x + v2.x) / 2, (v1.y + v2.y) / 2, (v1.z + v2.z) / 2)
+    return v1.__class__((v1.x + v2.x) / 2, (v1.y + v2.y) / 2, (v1.z + v2.z) / 2)
 
 def normal(face):
     """
@@ -243,3 +248,190 @@ def copyProperties(faceParent,faceChild):
     """
     faceChild.group = faceParent.group
     faceChild.color = faceParent.color
+
+class FaceGeometry:
+    """A `FaceGeometry` caches the normal, center, area and perimeter of faces.
+    On first use they are computed for all faces in one batch and stored
+    in arrays (n x 3 normals and centers, n areas and perimeters),
+    vectorized with NumPy if available, otherwise face by face in lists.
+    They are then looked up until `invalidate` is called after vertices were moved.
+    Use `Mesh.getGeometry` for a cache which is invalidated by `Mesh.translate`,
+    `Mesh.scale` and `Mesh.updateAdjacencies`.
+
+    Attributes
+    ----------
+    faces : list or mola.core.Mesh
+        The faces to be measured, or a mesh to measure its current faces.
+    """
+    def __init__(self, faces):
+        self.faces = faces
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Clears all cached values, necessary after moving vertices or changing faces.
+        """
+        self._faces = None
+        self._index = None
+        self._normals = None
+        self._centers = None
+        self._areas = None
+        self._perimeters = None
+
+    def _buildIndex(self):
+        if self._index is None:
+            self._faces = list(getattr(self.faces, 'faces', self.faces))
+            self._index = dict((id(f), i) for i, f in enumerate(self._faces))
+
+    def _getIndex(self, face):
+        self._buildIndex()
+        index = self._index.get(id(face))
+        if index is None:
+            # a face which is not in the list, e.g. a neighbour, is appended
+            self._addFaces([face])
+            index = self._index[id(face)]
+        return index
+
+    def _addFaces(self, faces):
+        # appends faces which are not in the list yet and their values in one batch,
+        # the arrays grow geometrically, rows beyond the faces are unused
+        self._buildIndex()
+        added = []
+        for face in faces:
+            if id(face) not in self._index:
+                self._index[id(face)] = len(self._faces)
+                self._faces.append(face)
+                added.append(face)
+        if not added or self._normals is None:
+            return
+        values = _faceValues(added)
+        if _np is None:
+            for cached, new in zip(self._getValues(), values):
+                cached.extend(new)
+            return
+        end = len(self._faces)
+        start = end - len(added)
+        cached = list(self._getValues())
+        for i, new in enumerate(values):
+            if len(cached[i]) < end:
+                grown = _np.zeros((max(end, 2 * len(cached[i])),) + cached[i].shape[1:])
+                grown[:start] = cached[i][:start]
+                cached[i] = grown
+            cached[i][start:end] = new
+        self._normals, self._centers, self._areas, self._perimeters = cached
+
+    def _getValues(self):
+        if self._normals is None:
+            self._buildIndex()
+            self._normals, self._centers, self._areas, self._perimeters = _faceValues(self._faces)
+        return self._normals, self._centers, self._areas, self._perimeters
+
+    def _getRow(self, values, index):
+        if _np is not None:
+            return values[index].tolist()
+        return values[index]
+
+    def normal(self, face):
+        """
+        Returns the normal of a face like `faceUtils.normal`, as a new `Vertex`.
+        """
+        index = self._getIndex(face)
+        return face.vertices[0].__class__(*self._getRow(self._getValues()[0], index))
+
+    def center(self, face):
+        """
+        Returns the center of a face like `faceUtils.center`, as a new `Vertex`.
+        """
+        index = self._getIndex(face)
+        return face.vertices[0].__class__(*self._getRow(self._getValues()[1], index))
+
+    def area(self, face):
+        """
+        Returns the area of a face like `faceUtils.area`.
+        """
+        index = self._getIndex(face)
+        return float(self._getValues()[2][index])
+
+    def perimeter(self, face):
+        """
+        Returns the perimeter of a face like `faceUtils.perimeter`.
+        """
+        index = self._getIndex(face)
+        return float(self._getValues()[3][index])
+
+    def compactness(self, face):
+        """
+        Returns the compactness of a face like `faceUtils.compactness`.
+        """
+        return self.area(face) / self.perimeter(face)
+
+    def curvature(self, face):
+        """
+        Returns the curvature of a face like `faceUtils.curvature`,
+        using the cached normals of the face and its neighbours.
+        """
+        # neighbours which are not in the list are appended in one batch
+        faces = [face]
+        vPrev = face.vertices[-1]
+        for v in face.vertices:
+            edge = v.getEdgeAdjacentToVertex(vPrev)
+            if edge != None:
+                nbFace = edge.face1
+                if edge.face1 == face:
+                    nbFace = edge.face2
+                if nbFace != None:
+                    faces.append(nbFace)
+            vPrev = v
+        self._addFaces(faces)
+        indices = [self._index[id(f)] for f in faces]
+        normals = self._getValues()[0]
+        faceNormal = self._getRow(normals, indices[0])
+        sumD = 0
+        for index in indices[1:]:
+            nbNormal = self._getRow(normals, index)
+            sumD += math.sqrt(sum((a - b) ** 2 for a, b in zip(nbNormal, faceNormal)))
+        return sumD / len(indices)
+
+def _faceValues(faces):
+    # normals, centers, areas and perimeters of a list of faces
+    if _np is None:
+        return ([_normalTuple(f) for f in faces], [_centerTuple(f) for f in faces],
+                [area(f) for f in faces], [perimeter(f) for f in faces])
+    sizes = _np.array([len(f.vertices) for f in faces], dtype=_np.int64)
+    points = _np.array([(v.x, v.y, v.z) for f in faces for v in f.vertices], dtype=_np.float64).reshape(-1, 3)
+    starts = _np.zeros(len(faces), dtype=_np.int64)
+    if len(faces) == 0:
+        return _np.zeros((0, 3)), _np.zeros((0, 3)), _np.zeros(0), _np.zeros(0)
+    starts[1:] = _np.cumsum(sizes)[:-1]
+    v0 = points[starts]
+    v1 = points[starts + 1]
+    v2 = points[starts + 2]
+    # normal of the first three vertices, like `normal`
+    normals = _np.cross(v1 - v0, v2 - v0)
+    lengths = _np.sqrt((normals * normals).sum(axis=1))
+    normals[lengths > 0] /= lengths[lengths > 0, _np.newaxis]
+    # area of the first triangle, plus the second one of faces with more vertices, like `area`
+    areas = 0.5 * _triangleAreas(v0, v1, v2)
+    more = sizes > 3
+    v3 = points[starts[more] + 3]
+    areas[more] += 0.5 * _triangleAreas(v2[more], v3, v0[more])
+    centers = _np.add.reduceat(points, starts, axis=0) / sizes[:, _np.newaxis]
+    # the next vertex of each vertex in its face
+    nexts = _np.arange(1, len(points) + 1)
+    nexts[starts + sizes - 1] = starts
+    edges = points[nexts] - points
+    perimeters = _np.add.reduceat(_np.sqrt((edges * edges).sum(axis=1)), starts)
+    return normals, centers, areas, perimeters
+
+def _triangleAreas(a, b, c):
+    # twice the areas of the triangles a b c
+    n = _np.cross(b - a, c - a)
+    return _np.sqrt((n * n).sum(axis=1))
+
+def _normalTuple(face):
+    n = normal(face)
+    return (n.x, n.y, n.z)
+
+def _centerTuple(face):
+    c = center(face)
+    return (c.x, c.y, c.z)
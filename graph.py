@@ -31,26 +31,17 @@ class Graph:
     @classmethod
     def fromGrid2D(cls,nX,nY,nbs8=False,continuous=False):
         gm = GridManager(nX,nY)
-        neighbours = [0] * gm.length
-        for i in range(gm.length):
-            neighbours[i] = gm.getNbs2D(i,nbs8,continuous)
-        return cls(neighbours)
+        return cls(gm.getNbLists(*gm.getNbTable2D(nbs8,continuous)))
 
     @classmethod
     def fromHexGrid2D(cls,nX,nY,continuous=False):
         gm = GridManager(nX, nY)
-        neighbours = [0] * gm.length
-        for i in range(gm.length):
-            neighbours[i] = gm.getNbs2DHex(i,continuous)
-        return cls(neighbours)
+        return cls(gm.getNbLists(*gm.getNbTable2DHex(continuous)))
 
     @classmethod
     def fromGrid3D(cls,nX,nY,nZ,mode=3,continuous=False):
         gm = GridManager(nX,nY,nZ)
-        neighbours = [0] * gm.length
-        for i in range(gm.length):
-            neighbours[i] = gm.getNbs3D(i, mode, continuous)
-        return cls(neighbours)
+        return cls(gm.getNbLists(*gm.getNbTable3D(mode, continuous)))
 
     @classmethod
     def fromMeshFaces(cls,mesh):
@@ -68,6 +59,22 @@ class Graph:
             neighbours[index] = nbs
         return cls(neighbours)
 
+    @classmethod
+    def fromHalfEdgeMeshFaces(cls,halfEdgeMesh):
+        """
+        face adjacency graph from a `mola.halfEdge.HalfEdgeMesh`,
+        faces on the boundary have fewer neighbours.
+        """
+        return cls(halfEdgeMesh.faceNeighbourLists())
+
+    @classmethod
+    def fromHalfEdgeMeshVertices(cls,halfEdgeMesh):
+        """
+        vertex adjacency graph from a `mola.halfEdge.HalfEdgeMesh`
+        """
+        n = halfEdgeMesh.mesh.numVertices()
+        return cls([list(halfEdgeMesh.oneRing(v)) for v in range(n)])
+
     def fromMeshEdges(self,mesh):
         pass
 
@@ -6,10 +6,39 @@ __license__    = 'MIT License'
 __email__      = ['<dbt@arch.ethz.ch>']
 
 import math
+from array import array
+# numpy is optional, it only speeds up building neighbor tables
+try:
+    import numpy as _np
+except ImportError:
+    _np = None
 from mola.core import Mesh
 from mola.core import Vertex
 from mola.core import Face
 
+# (dx, dy, dz) offsets of the 3D neighbourhoods by mode:
+# 1 :  6 nbs, shared face
+# 2 : 18 nbs, shared face or edge
+# 3 : 26 nbs, shared face, edge or vertex
+def _getDirections3D(mode):
+    directions = []
+    for i in range(-1, 2):
+        for j in range(-1, 2):
+            for k in range(-1, 2):
+                s = abs(i) + abs(j) + abs(k)
+                if s > 0 and s <= mode:
+                    directions.append((i, j, k))
+    return directions
+
+_directions3D = dict((mode, _getDirections3D(mode)) for mode in range(1, 4))
+
+# (dx, dy) offsets of the 2D neighbourhoods in the order of `GridManager.getNbs2D`,
+# and of the hexagonal one as pairs of offsets for even and odd rows (`getNbs2DHex`)
+_directions2D = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+_directions2D8 = [(1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1)]
+_directionsHex = [((1, 0), (1, 0)), ((-1, 0), (-1, 0)), ((0, -1), (0, -1)), ((0, 1), (0, 1)),
+                  ((1, 1), (-1, 1)), ((1, -1), (-1, -1))]
+
 class GridManager:
     """
     A `GridManager` is taking care of getting and setting values and
@@ -26,6 +55,8 @@ class GridManager:
         self.nZ = nZ
         self.length = nX * nY * nZ
         self.nYZ = nY * nZ
+        self._nbTables = {}
+        self._nbDeltas = {}
 
     def getIndex(self,x,y,z=0):
         """
@@ -56,6 +87,9 @@ class GridManager:
         returns the 6 neighbor indices of a cell in a hexagonal grid
         set `continuous` to `True` to get torus topology (left edge stitched to right and top to bottom)
         """
+        table = self._nbTables.get(('hex', continuous))
+        if table is not None:
+            return _tableNbs(table, index)
         nbs = []
         x = self.getX(index)
         y = self.getY(index)
@@ -101,6 +135,9 @@ class GridManager:
         set `nbs8` to `True` to get 8 neighbors, default is 4
         set `continuous` to `True` to get torus topology (left edge stitched to right and top to bottom)
         """
+        table = self._nbTables.get(('2D', bool(nbs8), continuous))
+        if table is not None:
+            return _tableNbs(table, index)
         nbs = []
         x = self.getX(index)
         y = self.getY(index)
@@ -145,37 +182,29 @@ class GridManager:
         return nbs
 
     def getNbs3D(self,index,mode=3,continuous=False):
-        nbs = []
+        """
+        returns the neighbor indices of a cell in a 3D grid
+        `mode` is the neighbourhood type: 1 for 6 nbs (shared face),
+        2 for 18 nbs (shared face or edge), 3 for 26 nbs (shared face, edge or vertex)
+        set `continuous` to `True` to get torus topology
+        """
+        mode = _nbMode(mode)
+        table = self._nbTables.get(('3D', mode, continuous))
+        if table is not None:
+            return _tableNbs(table, index)
         x = self.getX(index)
         y = self.getY(index)
         z = self.getZ(index)
+        # inner cells: constant index offsets, no bounds checks
+        if 0 < x < self.nX - 1 and 0 < y < self.nY - 1 and 0 < z < self.nZ - 1:
+            deltas = self._nbDeltas.get(mode)
+            if deltas is None:
+                deltas = [d[0] * self.nYZ + d[1] * self.nZ + d[2] for d in _directions3D[mode]]
+                self._nbDeltas[mode] = deltas
+            return [index + d for d in deltas]
 
-        # mode: neighbourhood type
-        # 1 :  6 nbs, shared face
-        # 2 : 18 nbs, shared face or edge
-        # 3 : 26 nbs, shared face, edge or vertex
-        if not mode:
-            mode==3
-        if mode<1:
-            mode==1
-        if mode>3:
-            mode==3
-
-        # precalculate distances
-        # dists = [1, math.sqrt(2), math.sqrt(3)]
-
-        # create a list of directions with x,y and z offsets
-        directions = []
-        for i in range(-1,2):
-            for j in range(-1,2):
-                for k in range(-1,2):
-                    l = [i,j,k]
-                    s = sum([abs(v) for v in l])
-                    # check for neighbourhood type
-                    if s > 0 and s <= mode:
-                        directions.append(l)
-
-        for d in directions:
+        nbs = []
+        for d in _directions3D[mode]:
             ex = x + d[0]
             ey = y + d[1]
             ez = z + d[2]
@@ -188,25 +217,229 @@ class GridManager:
 
         return nbs
 
+    def getNbTable2D(self,nbs8=False,continuous=False):
+        """
+        returns the precomputed neighbors of all cells as in `getNbs2D`,
+        see `getNbTable3D`
+        """
+        nbs8 = bool(nbs8)
+        directions = _directions2D8 if nbs8 else _directions2D
+        return self._getNbTable(('2D', nbs8, continuous), [(d, d) for d in directions],
+                                continuous, lambda i: self.getNbs2D(i, nbs8, continuous))
+
+    def getNbTable2DHex(self,continuous=False):
+        """
+        returns the precomputed neighbors of all cells as in `getNbs2DHex`,
+        see `getNbTable3D`
+        """
+        return self._getNbTable(('hex', continuous), _directionsHex,
+                                continuous, lambda i: self.getNbs2DHex(i, continuous))
+
+    def getNbTable3D(self,mode=3,continuous=False):
+        """
+        returns the precomputed neighbors of all cells as in `getNbs3D`,
+        as a tuple (nbs, counts) of two flat int arrays (`numpy.ndarray`
+        if numpy is available, `array.array` otherwise):
+        the neighbors of cell i are nbs[i * size:i * size + counts[i]],
+        with `size` 6, 18 or 26 by `mode`, the remaining entries are -1.
+        The table is built once per (mode, continuous) and then also
+        used by `getNbs3D`, see `clearNbTables`.
+        It takes 4 bytes per entry, a 200^3 grid with 26 neighbors about 830 MB.
+        """
+        mode = _nbMode(mode)
+        return self._getNbTable(('3D', mode, continuous), [(d, d) for d in _directions3D[mode]],
+                                continuous, lambda i: self.getNbs3D(i, mode, continuous))
+
+    def clearNbTables(self):
+        """
+        releases the neighbor tables built by `getNbTable2D`, `getNbTable2DHex` and `getNbTable3D`
+        """
+        self._nbTables = {}
+
+    def _getNbTable(self,key,directions,continuous,function):
+        # directions: offsets of the neighbors of cells in (even, odd) rows,
+        # (dx, dy) offsets are in the plane z = 0 like `getNbs2D`
+        table = self._nbTables.get(key)
+        if table is None:
+            if _np is not None:
+                table = self._buildNbTableArrays(directions, continuous)
+            else:
+                table = self._buildNbTableLists(len(directions), function)
+            self._nbTables[key] = table
+        return table[0], table[1]
+
+    def _buildNbTableArrays(self,directions,continuous,blockSize=1<<15):
+        # vectorized over blocks of cells which stay in the cache, the index term
+        # and the valid cells of each axis are computed once per offset and block
+        size = len(directions)
+        dims = (self.nX, self.nY, self.nZ)
+        strides = (self.nYZ, self.nZ, 1)
+        offsets = []
+        for even, oddD in directions:
+            # (dx, dy) offsets are in the plane z = 0 like `getNbs2D`
+            offsets.append([even[axis] if even[axis] == oddD[axis] else (even[axis], oddD[axis])
+                            for axis in range(len(even))])
+        nbs = _np.empty((self.length, size), dtype=_np.int32)
+        for start in range(0, self.length, blockSize):
+            index = _np.arange(start, min(start + blockSize, self.length), dtype=_np.int32)
+            coords = (index // self.nYZ, (index // self.nZ) % self.nY, index % self.nZ)
+            odd = coords[1] % 2 == 1
+            terms = {}
+            block = nbs[start:start + len(index)]
+            for j, direction in enumerate(offsets):
+                nb = 0
+                valid = None
+                for axis, offset in enumerate(direction):
+                    term = terms.get((axis, offset))
+                    if term is None:
+                        c = coords[axis] + (_np.where(odd, offset[1], offset[0]) if isinstance(offset, tuple) else offset)
+                        if continuous:
+                            term = ((c % dims[axis]) * strides[axis], None)
+                        else:
+                            term = (c * strides[axis], (c >= 0) & (c < dims[axis]))
+                        terms[(axis, offset)] = term
+                    nb = nb + term[0]
+                    if term[1] is not None:
+                        valid = term[1] if valid is None else valid & term[1]
+                block[:, j] = nb if valid is None else _np.where(valid, nb, -1)
+        # move the valid neighbors of cells at the border to the front, keeping their order
+        counts = (nbs >= 0).sum(axis=1, dtype=_np.int32)
+        border = _np.flatnonzero(counts < size)
+        borderNbs = nbs[border]
+        order = _np.argsort(borderNbs < 0, axis=1, kind='stable')
+        nbs[border] = _np.take_along_axis(borderNbs, order, axis=1)
+        return nbs.reshape(-1), counts, size
+
+    def _buildNbTableLists(self,size,function):
+        nbs = array('i')
+        counts = array('i')
+        padding = [-1] * size
+        for i in range(self.length):
+            cellNbs = function(i)
+            nbs.extend(cellNbs)
+            nbs.extend(padding[len(cellNbs):])
+            counts.append(len(cellNbs))
+        return nbs, counts, size
+
+    def getNbLists(self,nbs,counts):
+        """
+        returns a list with the list of neighbors of each cell of a neighbor table,
+        e.g. `getNbLists(*getNbTable3D())`
+        """
+        size = len(nbs) // len(counts) if len(counts) > 0 else 0
+        flat = nbs.tolist()
+        return [flat[i * size:i * size + c] for i, c in enumerate(counts.tolist())]
+
+# the sides of a cell as axis, step to the neighbor, the axes u and v of the quad
+# and its corners as (u, v) steps, in the vertex order of the faces of `Grid.getQuadMesh`
+_quadSides = [(0, 1, 1, 2, ((0, 0), (1, 0), (1, 1), (0, 1))),
+              (0, -1, 1, 2, ((1, 0), (0, 0), (0, 1), (1, 1))),
+              (1, 1, 0, 2, ((1, 0), (0, 0), (0, 1), (1, 1))),
+              (1, -1, 0, 2, ((0, 0), (1, 0), (1, 1), (0, 1))),
+              (2, 1, 0, 1, ((0, 0), (1, 0), (1, 1), (0, 1))),
+              (2, -1, 0, 1, ((0, 1), (1, 1), (1, 0), (0, 0)))]
+
+def _quadProperties(value, functionColor, functionGroup):
+    # a tuple, comparable when merging quads and not shared mutably by them
+    color = (1,1,1,1) if functionColor is None else tuple(functionColor(value))
+    group = 0 if functionGroup is None else functionGroup(value)
+    return color, group
+
+def _addSideQuad(mesh, vertices, cell, side, wu, wv, properties):
+    # adds the quad of a cell side spanning wu x wv cells
+    axis, step, uAxis, vAxis, corners = side
+    quad = []
+    for cu, cv in corners:
+        p = list(cell)
+        if step > 0:
+            p[axis] += 1
+        p[uAxis] += cu * wu
+        p[vAxis] += cv * wv
+        p = tuple(p)
+        if vertices is None:
+            quad.append(Vertex(p[0], p[1], p[2]))
+            continue
+        v = vertices.get(p)
+        if v is None:
+            v = Vertex(p[0], p[1], p[2])
+            vertices[p] = v
+            mesh.vertices.append(v)
+        quad.append(v)
+    face = Face(quad)
+    face.color, face.group = properties
+    mesh.faces.append(face)
+
+def _nbMode(mode):
+    if not mode:
+        return 3
+    return max(1, min(3, mode))
+
+def _tableNbs(table, index):
+    nbs, counts, size = table
+    start = index * size
+    return nbs[start:start + counts[index]].tolist()
+
 class Grid(GridManager):
+    """
+    A `Grid` stores a value for each cell of an orthogonal grid.
+
+    Attributes
+    ----------
+    values : list
+        The values of all cells, see `getIndex`.
+    changes : set
+        The indices of the values set since the last `popChanges`,
+        `None` if changes are not tracked.
+    """
     def __init__(self,nX,nY,nZ=1,values=None):
-        self.nX = nX
-        self.nY = nY
-        self.nZ = nZ
-        self.nYZ = nY * nZ
+        GridManager.__init__(self,nX,nY,nZ)
         if values is None:
             self.values = [0] * nX * nY * nZ
         else:
             self.values = values
+        self.changes = None
 
     def set_xyz(self,value,x,y,z=0):
-        self.values[self.getIndex(x, y, z)] = value
+        index = self.getIndex(x, y, z)
+        self.values[index] = value
+        if self.changes is not None:
+            self.changes.add(index)
 
     def get_xyz(self,x,y,z=0):
         return self.values[self.getIndex(x, y, z)]
 
     def set_index(self,value,index):
         self.values[index] = value
+        if self.changes is not None:
+            self.changes.add(index)
+
+    def trackChanges(self,track=True):
+        """
+        starts (or stops) recording the indices of values set by
+        `set_xyz` and `set_index`, e.g. for `mola.marchingCubes.IncrementalMarchingCubes`.
+        Values written directly to `values` need to be marked with `markChanged`.
+        """
+        if not track:
+            self.changes = None
+        elif self.changes is None:
+            self.changes = set()
+
+    def markChanged(self,index):
+        """
+        records a change of the value at index
+        """
+        if self.changes is not None:
+            self.changes.add(index)
+
+    def popChanges(self):
+        """
+        returns the indices of the values changed since the last call and clears them
+        """
+        changes = self.changes
+        if changes is None:
+            return set()
+        self.changes = set()
+        return changes
 
     def get_index(self,index):
         return self.values[index]
@@ -215,63 +448,209 @@ class Grid(GridManager):
         # TODO
         return []
 
-    def getQuadMesh(self,functionIn,functionOut):
-        faces=[]
-        for x in range(self.nX):
-            for y in range(self.nY):
-                for z in range(self.nZ):
-                    index=self.getIndex(x,y,z)
-                    if functionIn(self.values[index]):
-                        # (x,y) (x1,y) (x1,y1) (x,y1)
-                        if x==self.nX-1 or functionOut(self.get_xyz(x+1,y,z)):
-                            v1=Vertex(x+1,y,z)
-                            v2=Vertex(x+1,y+1,z)
-                            v3=Vertex(x+1,y+1,z+1)
-                            v4=Vertex(x+1,y,z+1)
-                            faces.append(Face([v1,v2,v3,v4]))
-                        if x==0 or functionOut(self.get_xyz(x-1,y,z)):
-                            v1=Vertex(x,y+1,z)
-                            v2=Vertex(x,y,z)
-                            v3=Vertex(x,y,z+1)
-                            v4=Vertex(x,y+1,z+1)
-                            faces.append(Face([v1,v2,v3,v4]))
-                        if y==self.nY-1 or functionOut(self.get_xyz(x,y+1,z)):
-                            v1=Vertex(x+1,y+1,z)
-                            v2=Vertex(x,y+1,z)
-                            v3=Vertex(x,y+1,z+1)
-                            v4=Vertex(x+1,y+1,z+1)
-                            faces.append(Face([v1,v2,v3,v4]))
-                        if y==0 or functionOut(self.get_xyz(x,y-1,z)):
-                            v1=Vertex(x,y,z)
-                            v2=Vertex(x+1,y,z)
-                            v3=Vertex(x+1,y,z+1)
-                            v4=Vertex(x,y,z+1)
-                            faces.append(Face([v1,v2,v3,v4]))
-                        if z==self.nZ-1 or functionOut(self.get_xyz(x,y,z+1)):
-                            v1=Vertex(x,y,z+1)
-                            v2=Vertex(x+1,y,z+1)
-                            v3=Vertex(x+1,y+1,z+1)
-                            v4=Vertex(x,y+1,z+1)
-                            faces.append(Face([v1,v2,v3,v4]))
-                        if z==0 or functionOut(self.get_xyz(x,y,z-1)):
-                            v1=Vertex(x,y+1,z)
-                            v2=Vertex(x+1,y+1,z)
-                            v3=Vertex(x+1,y,z)
-                            v4=Vertex(x,y,z)
-                            faces.append(Face([v1,v2,v3,v4]))
+    def getQuadMesh(self,functionIn,functionOut,greedy=False,sharedVertices=False,functionColor=None,functionGroup=None):
+        """
+        returns a `Mesh` with a quad for every side of a cell with `functionIn(value)`
+        which is on the border of the grid or next to a cell with `functionOut(value)`.
+
+        Arguments:
+        ----------
+        functionIn, functionOut : function
+            Functions of the value of a cell returning a bool
+        greedy : bool, optional
+            Merges adjacent coplanar quads with the same color and group into
+            maximal rectangles. Their corners are not shared with the sides
+            of larger neighbouring rectangles (T-junctions).
+        sharedVertices : bool, optional
+            Quads share one `Vertex` per grid corner, which are added to `mesh.vertices`.
+            By default every quad has four own vertices.
+        functionColor, functionGroup : function, optional
+            Functions of the value of the inner cell returning the `color`
+            and `group` of a quad
+        """
         mesh = Mesh()
-        mesh.faces = faces
+        vertices = {} if sharedVertices else None
+        sides = self._getExposedSides(functionIn, functionOut, functionColor, functionGroup)
+        if not greedy:
+            for cell, side, properties in sides:
+                _addSideQuad(mesh, vertices, cell, _quadSides[side], 1, 1, properties)
+            return mesh
+        # group the sides by direction and layer, then merge rectangles in each layer
+        layers = {}
+        for cell, side, properties in sides:
+            axis, step, uAxis, vAxis, corners = _quadSides[side]
+            layer = layers.setdefault((side, cell[axis]), {})
+            layer[(cell[uAxis], cell[vAxis])] = properties
+        for (side, c), layer in sorted(layers.items()):
+            axis, step, uAxis, vAxis, corners = _quadSides[side]
+            for u, v in sorted(layer):
+                properties = layer.get((u, v))
+                if properties is None:
+                    continue
+                wv = 1
+                while layer.get((u, v + wv)) == properties:
+                    wv += 1
+                wu = 1
+                while all(layer.get((u + wu, v + j)) == properties for j in range(wv)):
+                    wu += 1
+                for i in range(wu):
+                    for j in range(wv):
+                        del layer[(u + i, v + j)]
+                cell = [0, 0, 0]
+                cell[axis] = c
+                cell[uAxis] = u
+                cell[vAxis] = v
+                _addSideQuad(mesh, vertices, cell, _quadSides[side], wu, wv, properties)
         return mesh
 
+    def _getExposedSides(self,functionIn,functionOut,functionColor=None,functionGroup=None):
+        # yields (cell, side, (color, group)) of the exposed cell sides,
+        # cell by cell in index order and side by side in the order of `_quadSides`
+        for index in range(self.length):
+            for side in self._getCellSides(index, functionIn, functionOut, functionColor, functionGroup):
+                yield side
+
+    def _getCellSides(self,index,functionIn,functionOut,functionColor,functionGroup):
+        value = self.get_index(index)
+        if not functionIn(value):
+            return
+        cell = (self.getX(index), self.getY(index), self.getZ(index))
+        dims = (self.nX, self.nY, self.nZ)
+        properties = None
+        for side in range(6):
+            axis, step, uAxis, vAxis, corners = _quadSides[side]
+            nb = list(cell)
+            nb[axis] += step
+            if 0 <= nb[axis] < dims[axis] and not functionOut(self.get_xyz(nb[0],nb[1],nb[2])):
+                continue
+            if properties is None:
+                properties = _quadProperties(value, functionColor, functionGroup)
+            yield cell, side, properties
+
 class HexGrid(Grid):
     def __init__(self,nX,nY,nZ=1,values=None):
-        self.nX = nX
-        self.nY = nY
-        self.nZ = nZ
-        self.nYZ = nY * nZ
+        GridManager.__init__(self,nX,nY,nZ)
         if values == None:
             self.values = [0] * nX * nY * nZ
+        self.changes = None
         self.dimY = math.sqrt(3) * 0.5
 
     def getPosition(self,x,y,z=0):
         return [x + (y % 2) * 0.5, y * self.dimY, z]
+
+class SparseGrid(Grid):
+    """
+    A `Grid` for large and mostly empty volumes. Cells are stored in cubic
+    chunks which are only allocated once a value other than `default` is set,
+    memory scales with the occupied chunks instead of the bounding volume.
+
+    Arguments:
+    ----------
+    nX, nY, nZ : int
+        The number of elements in x,y and z direction
+    default : optional
+        The value of all cells which have not been set, default is 0
+    chunkSize : int, optional
+        The number of cells of a chunk in each direction, default is 8
+
+    Attributes
+    ----------
+    chunks : dict
+        The allocated chunks, lists of chunkSize^3 values keyed by the
+        chunk coordinates (x // chunkSize, y // chunkSize, z // chunkSize).
+    values : sequence
+        A read/write view of all values by index, see `getIndex`.
+    """
+    def __init__(self,nX,nY,nZ=1,default=0,chunkSize=8):
+        GridManager.__init__(self,nX,nY,nZ)
+        self.default = default
+        self.chunkSize = chunkSize
+        self.chunks = {}
+        self.values = _SparseValues(self)
+        self.changes = None
+
+    def get_xyz(self,x,y,z=0):
+        cs = self.chunkSize
+        chunk = self.chunks.get((x // cs, y // cs, z // cs))
+        if chunk is None:
+            return self.default
+        return chunk[((x % cs) * cs + y % cs) * cs + z % cs]
+
+    def set_xyz(self,value,x,y,z=0):
+        if not (0 <= x < self.nX and 0 <= y < self.nY and 0 <= z < self.nZ):
+            raise IndexError('cell out of grid: ' + str((x, y, z)))
+        cs = self.chunkSize
+        key = (x // cs, y // cs, z // cs)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            if value == self.default:
+                return
+            chunk = [self.default] * (cs * cs * cs)
+            self.chunks[key] = chunk
+        chunk[((x % cs) * cs + y % cs) * cs + z % cs] = value
+        if self.changes is not None:
+            self.changes.add(self.getIndex(x, y, z))
+
+    def get_index(self,index):
+        return self.get_xyz(self.getX(index), self.getY(index), self.getZ(index))
+
+    def set_index(self,value,index):
+        self.set_xyz(value, self.getX(index), self.getY(index), self.getZ(index))
+
+    def getSetIndices(self):
+        """
+        returns the sorted indices of all cells with a value other than `default`
+        """
+        indices = []
+        cs = self.chunkSize
+        for (cx, cy, cz), chunk in self.chunks.items():
+            for i, value in enumerate(chunk):
+                if value != self.default:
+                    x = cx * cs + i // (cs * cs)
+                    y = cy * cs + (i // cs) % cs
+                    z = cz * cs + i % cs
+                    indices.append(self.getIndex(x, y, z))
+        indices.sort()
+        return indices
+
+    def compact(self):
+        """
+        releases the chunks in which all values are `default` again
+        """
+        for key in [key for key, chunk in self.chunks.items() if all(v == self.default for v in chunk)]:
+            del self.chunks[key]
+
+    def _getExposedSides(self,functionIn,functionOut,functionColor=None,functionGroup=None):
+        # only the allocated cells can be inside, unless the default value is
+        if functionIn(self.default):
+            for side in Grid._getExposedSides(self, functionIn, functionOut, functionColor, functionGroup):
+                yield side
+            return
+        for index in self.getSetIndices():
+            for side in self._getCellSides(index, functionIn, functionOut, functionColor, functionGroup):
+                yield side
+
+class _SparseValues(object):
+    # list-like access to the values of a `SparseGrid` by index,
+    # e.g. for `mola.marchingCubes.marchingCubesFromGrid`
+    def __init__(self, grid):
+        self.grid = grid
+
+    def __len__(self):
+        return self.grid.length
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.grid.length
+        if not 0 <= index < self.grid.length:
+            raise IndexError('grid index out of range')
+        return self.grid.get_index(index)
+
+    def __setitem__(self, index, value):
+        if index < 0:
+            index += self.grid.length
+        self.grid.set_index(value, index)
+
+    def __iter__(self):
+        for index in range(self.grid.length):
+            yield self.grid.get_index(index)
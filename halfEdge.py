@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+__author__     = ['Benjamin Dillenburger','Demetris Shammas','Mathias Bernhard']
+__copyright__  = 'Copyright 2019 / Digital Building Technologies DBT / ETH Zurich'
+__license__    = 'MIT License'
+__email__      = ['<dbt@arch.ethz.ch>']
+
+import numpy as np
+from mola.arrayMesh import ArrayMesh
+
+class HalfEdgeMesh:
+    """A `HalfEdgeMesh` is a compact half-edge index over the faces of an `ArrayMesh`.
+    Half-edge `h` is the corner `h` of the flat face array, it runs from
+    `vertex[h]` to `vertex[next[h]]` along the border of `face[h]`.
+
+    Attributes
+    ----------
+    mesh : mola.arrayMesh.ArrayMesh
+        The mesh the index is built on.
+    vertex : numpy.ndarray
+        The origin vertex of every half-edge.
+    face : numpy.ndarray
+        The face of every half-edge.
+    next, prev : numpy.ndarray
+        The following and preceding half-edge in the same face.
+    twin : numpy.ndarray
+        The opposite half-edge in the neighbour face, -1 on the boundary.
+    edge : numpy.ndarray
+        The index of the undirected edge of every half-edge.
+    edgeHalfEdge : numpy.ndarray
+        One half-edge of every undirected edge, the boundary one for boundary edges.
+    vertexHalfEdge : numpy.ndarray
+        One outgoing half-edge of every vertex, the boundary one for boundary vertices,
+        -1 for vertices not used by any face.
+    faceHalfEdge : numpy.ndarray
+        The first half-edge of every face.
+    """
+    def __init__(self, arrayMesh):
+        self.mesh = arrayMesh
+        nV = arrayMesh.numVertices()
+        offsets = arrayMesh.offsets
+        nH = len(arrayMesh.faces)
+        h = np.arange(nH)
+        self.vertex = arrayMesh.faces.copy()
+        self.face = arrayMesh.cornerFaces()
+        self.faceHalfEdge = offsets[:-1].copy()
+        self.next = h + 1
+        self.next[offsets[1:] - 1] = offsets[:-1]
+        self.prev = h - 1
+        self.prev[offsets[:-1]] = offsets[1:] - 1
+        # match (a,b) with (b,a) by sorting the directed edge keys
+        origin = self.vertex
+        dest = self.vertex[self.next]
+        keys = origin * nV + dest
+        order = np.argsort(keys, kind='stable')
+        sortedKeys = keys[order]
+        pos = np.searchsorted(sortedKeys, dest * nV + origin)
+        pos = np.minimum(pos, max(nH - 1, 0))
+        self.twin = np.full(nH, -1, dtype=np.int64)
+        if nH > 0:
+            found = sortedKeys[pos] == dest * nV + origin
+            self.twin[found] = order[pos[found]]
+            # non manifold edges: keep only symmetric pairs
+            paired = self.twin >= 0
+            paired[paired] = self.twin[self.twin[paired]] == h[paired]
+            self.twin[~paired] = -1
+        # undirected edges
+        first = (self.twin < 0) | (h < self.twin)
+        self.edgeHalfEdge = h[first]
+        self.edge = np.zeros(nH, dtype=np.int64)
+        self.edge[first] = np.arange(len(self.edgeHalfEdge))
+        inner = ~first
+        self.edge[inner] = self.edge[self.twin[inner]]
+        # outgoing half-edges, boundary ones win
+        self.vertexHalfEdge = np.full(nV, -1, dtype=np.int64)
+        self.vertexHalfEdge[origin] = h
+        boundary = h[self.twin < 0]
+        self.vertexHalfEdge[origin[boundary]] = boundary
+
+    @classmethod
+    def fromMesh(cls, mesh):
+        """
+        Builds the half-edge index of a `mola.core.Mesh`.
+        Vertex and face indices refer to `ArrayMesh.fromMesh(mesh)`, stored in `mesh`.
+        """
+        return cls(ArrayMesh.fromMesh(mesh))
+
+    def numEdges(self):
+        """
+        Returns the number of undirected edges.
+        """
+        return len(self.edgeHalfEdge)
+
+    def isBoundaryVertex(self):
+        """
+        Returns a bool array, true for all vertices on a boundary.
+        """
+        result = np.zeros(self.mesh.numVertices(), dtype=bool)
+        result[self.vertex[self.twin < 0]] = True
+        return result
+
+    def valences(self):
+        """
+        Returns the number of edges connected to each vertex.
+        """
+        nV = self.mesh.numVertices()
+        he = self.edgeHalfEdge
+        valence = np.bincount(self.vertex[he], minlength=nV)
+        valence += np.bincount(self.vertex[self.next[he]], minlength=nV)
+        return valence
+
+    def vertexOutgoing(self, v):
+        """
+        Iterates the outgoing half-edges of vertex `v`, rotating around the vertex.
+        """
+        start = h = int(self.vertexHalfEdge[v])
+        if h < 0:
+            return
+        twin = self.twin
+        prev = self.prev
+        while True:
+            yield h
+            h = int(twin[prev[h]])
+            if h < 0 or h == start:
+                return
+
+    def oneRing(self, v):
+        """
+        Iterates the neighbour vertices of vertex `v` in order around the vertex.
+        """
+        h = -1
+        for h in self.vertexOutgoing(v):
+            yield int(self.vertex[self.next[h]])
+        if h >= 0 and self.twin[self.prev[h]] < 0:
+            # last neighbour of a boundary vertex
+            yield int(self.vertex[self.prev[h]])
+
+    def vertexFaces(self, v):
+        """
+        Iterates the faces around vertex `v`.
+        """
+        for h in self.vertexOutgoing(v):
+            yield int(self.face[h])
+
+    def faceVertices(self, f):
+        """
+        Returns the vertex indices of face `f`.
+        """
+        return self.mesh.getFace(f)
+
+    def faceHalfEdges(self, f):
+        """
+        Returns the half-edges along the border of face `f`.
+        """
+        return np.arange(self.mesh.offsets[f], self.mesh.offsets[f + 1])
+
+    def faceNeighbours(self, f):
+        """
+        Iterates the faces sharing an edge with face `f`.
+        """
+        for t in self.twin[self.faceHalfEdges(f)].tolist():
+            if t >= 0:
+                yield int(self.face[t])
+
+    def faceNeighbourLists(self):
+        """
+        Returns for each face the list of faces sharing an edge with it.
+        """
+        twin = self.twin.tolist()
+        faces = self.face.tolist()
+        offsets = self.mesh.offsets.tolist()
+        neighbours = []
+        for f in range(self.mesh.numFaces()):
+            neighbours.append([faces[t] for t in twin[offsets[f]:offsets[f + 1]] if t >= 0])
+        return neighbours
+
+    def boundaryLoops(self):
+        """
+        Returns the boundaries of the mesh as lists of vertex indices,
+        oriented like the faces they belong to.
+        """
+        twin = self.twin
+        nxt = self.next
+        visited = set()
+        loops = []
+        for start in np.nonzero(twin < 0)[0].tolist():
+            if start in visited:
+                continue
+            loop = []
+            h = start
+            while h not in visited:
+                visited.add(h)
+                loop.append(int(self.vertex[h]))
+                # rotate around the end vertex to the next boundary half-edge
+                h = int(nxt[h])
+                while twin[h] >= 0:
+                    h = int(nxt[twin[h]])
+            loops.append(loop)
+        return loops
@@ -8,6 +8,7 @@ __email__      = ['<dbt@arch.ethz.ch>']
 from mola.core import Mesh
 from mola.core import Vertex
 from mola.core import Face
+from mola.core import vertexKey
 import ntpath
 
 def __strColor(color,decimals=1):
@@ -42,10 +43,10 @@ def importOBJFaces(filename):
     """Loads a Wavefront OBJ file. """
     return importOBJ(filename).faces
 
-def exportOBJ(mesh,fileNameOBJ,exportColors=True,exportGroups=True,weldVertices=True):
-    exportOBJFaces(mesh.faces,fileNameOBJ,exportColors,exportGroups,weldVertices)
+def exportOBJ(mesh,fileNameOBJ,exportColors=True,exportGroups=True,weldVertices=True,weldEpsilon=0):
+    exportOBJFaces(mesh.faces,fileNameOBJ,exportColors,exportGroups,weldVertices,weldEpsilon)
 
-def exportOBJFaces(faces,fileNameOBJ,exportColors=True,exportGroups=True,weldVertices=True):
+def exportOBJFaces(faces,fileNameOBJ,exportColors=True,exportGroups=True,weldVertices=True,weldEpsilon=0):
     """
     Exports the faces as an Alias wavefront obj file.
 
@@ -55,6 +56,11 @@ def exportOBJFaces(faces,fileNameOBJ,exportColors=True,exportGroups=True,weldVer
         The face to be measured
     fileNameOBJ : String
         The path and filename for the *.obj mesh file
+    weldVertices : bool
+        Write vertices at the same position only once, default True
+    weldEpsilon : float
+        Write vertices rounding to the same point of a grid with this spacing
+        only once, default 0 (exact)
     """
     file = open(fileNameOBJ, "w")
     if exportColors:
@@ -81,7 +87,7 @@ def exportOBJFaces(faces,fileNameOBJ,exportColors=True,exportGroups=True,weldVer
 
         if weldVertices:
             for p in face.vertices:
-                ptuple = (p.x,p.y,p.z)
+                ptuple = vertexKey(p,weldEpsilon)
                 if ptuple in vertices:
                     faceString += " " + str(vertices[ptuple])
                 else:
@@ -104,3 +110,39 @@ def exportOBJFaces(faces,fileNameOBJ,exportColors=True,exportGroups=True,weldVer
             fileMTL.write("newmtl material" + __strColor(mat) + "\n")
             fileMTL.write("Kd " + str(mat[0]) + " " + str(mat[1]) + " " + str(mat[2]) + "\n")
         fileMTL.close()
+
+class OBJWriter:
+    """
+    Writes vertices and faces to a Wavefront OBJ file as they are added,
+    e.g. as the sink of `mola.arrayMarchingCubes.marchingCubesStream`,
+    so that the whole mesh never needs to be in memory.
+
+    Attributes
+    ----------
+    vertexCount : int
+        The number of vertices written so far.
+    """
+    def __init__(self,fileNameOBJ):
+        self.file = open(fileNameOBJ, "w")
+        self.vertexCount = 0
+
+    def addVertices(self,vertices):
+        """
+        Writes vertices given as rows of x,y,z coordinates (list or numpy array),
+        they are numbered in the order they are added, starting with 0.
+        """
+        if hasattr(vertices, "tolist"):
+            vertices = vertices.tolist()
+        self.file.write("".join(["v " + str(x) + " " + str(y) + " " + str(z) + "\n" for x,y,z in vertices]))
+        self.vertexCount += len(vertices)
+
+    def addFaces(self,faces):
+        """
+        Writes faces given as rows of vertex indices (starting with 0).
+        """
+        if hasattr(faces, "tolist"):
+            faces = faces.tolist()
+        self.file.write("".join(["f " + " ".join([str(i + 1) for i in face]) + "\n" for face in faces]))
+
+    def close(self):
+        self.file.close()
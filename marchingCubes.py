@@ -69,6 +69,129 @@ def marchingCubes(nX,nY,nZ,values,iso):
                                 mesh.faces.append(Face(vs))
     return mesh
 
+class IncrementalMarchingCubes:
+    """
+    Keeps the iso surface mesh of a `mola.grid.Grid` up to date while the grid
+    is edited. The grid tracks its changed values (`Grid.trackChanges`) and
+    `update` re-extracts only the cells around them, patching their triangles
+    into the persistent `mesh`. Vertices are shared between the triangles.
+
+    Attributes
+    ----------
+    grid : mola.grid.Grid
+        The grid of values.
+    iso : float
+        The iso value of the surface.
+    mesh : mola.core.Mesh
+        The surface, updated in place.
+    """
+    def __init__(self,grid,iso):
+        self.grid = grid
+        self.iso = iso
+        self.mesh = Mesh()
+        nZ = grid.nZ
+        nYZ = grid.nY * nZ
+        self._length = grid.nX * nYZ
+        self._strides = (nYZ, nZ, 1)
+        # the value indices of the cell corners in the order of the case bits
+        self._cornerOffsets = (nZ, nYZ + nZ, nYZ, 0, nZ + 1, nYZ + nZ + 1, nYZ + 1, 1)
+        self._cellFaces = {}
+        self._edgeVertices = {}
+        self._facePositions = {}
+        self._vertexPositions = {}
+        grid.trackChanges()
+        grid.popChanges()
+        for x in range(grid.nX - 1):
+            for y in range(grid.nY - 1):
+                for z in range(grid.nZ - 1):
+                    self._addCell(x,y,z)
+
+    def update(self):
+        """
+        Re-extracts the cells touching a value changed since the last update,
+        returns the number of re-extracted cells.
+        """
+        grid = self.grid
+        cells = set()
+        for index in grid.popChanges():
+            x = grid.getX(index)
+            y = grid.getY(index)
+            z = grid.getZ(index)
+            for cx in range(max(x - 1, 0), min(x + 1, grid.nX - 1)):
+                for cy in range(max(y - 1, 0), min(y + 1, grid.nY - 1)):
+                    for cz in range(max(z - 1, 0), min(z + 1, grid.nZ - 1)):
+                        cells.add((cx,cy,cz))
+        # remove all before adding, so no vertex with an outdated position is reused
+        for cell in cells:
+            self._removeCell(cell)
+        for cell in cells:
+            self._addCell(*cell)
+        return len(cells)
+
+    def _addCell(self,x,y,z):
+        values = self.grid.values
+        index = self.grid.getIndex(x,y,z)
+        caseNumber = 0
+        for i in range(7,-1,-1):
+            if values[index + self._cornerOffsets[i]] > self.iso:
+                caseNumber += 1
+            if i > 0:
+                caseNumber = caseNumber << 1
+        offset = caseNumber * 15
+        faces = []
+        for i in range(offset,offset + 15,3):
+            if _faces[i] > -1:
+                keys = [self._addEdgeVertex(x,y,z,_faces[j]) for j in range(i,i+3)]
+                face = Face([self._edgeVertices[key][0] for key in keys])
+                self._facePositions[id(face)] = len(self.mesh.faces)
+                self.mesh.faces.append(face)
+                faces.append((face,keys))
+        if len(faces) > 0:
+            self._cellFaces[(x,y,z)] = faces
+
+    def _addEdgeVertex(self,x,y,z,edge):
+        axis = _edgeAxis[edge]
+        start = _edgeStart[edge]
+        index = self.grid.getIndex(x + start[0],y + start[1],z + start[2])
+        key = axis * self._length + index
+        entry = self._edgeVertices.get(key)
+        if entry is None:
+            values = self.grid.values
+            t = _v(values[index],values[index + self._strides[axis]],self.iso)
+            position = [x + start[0],y + start[1],z + start[2]]
+            position[axis] += t
+            vertex = Vertex(position[0],position[1],position[2])
+            self._vertexPositions[id(vertex)] = len(self.mesh.vertices)
+            self.mesh.vertices.append(vertex)
+            entry = [vertex,0]
+            self._edgeVertices[key] = entry
+        entry[1] += 1
+        return key
+
+    def _removeCell(self,cell):
+        for face,keys in self._cellFaces.pop(cell,[]):
+            _removeFromList(self.mesh.faces,self._facePositions,face)
+            for key in keys:
+                entry = self._edgeVertices[key]
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._edgeVertices[key]
+                    _removeFromList(self.mesh.vertices,self._vertexPositions,entry[0])
+
+def _removeFromList(items,positions,item):
+    # constant time removal, the last item takes the place of the removed one
+    position = positions.pop(id(item))
+    last = items.pop()
+    if last is not item:
+        items[position] = last
+        positions[id(last)] = position
+
+# the 12 cell edges as axis (0: x, 1: y, 2: z) and offset of their start corner
+_edgeAxis = (0, 1, 0, 1, 0, 1, 0, 1, 2, 2, 2, 2)
+_edgeStart = ((0, 1, 0), (1, 0, 0), (0, 0, 0), (0, 0, 0),
+              (0, 1, 1), (1, 0, 1), (0, 0, 1), (0, 0, 1),
+              (0, 1, 0), (1, 1, 0), (0, 0, 0), (1, 0, 0))
+
 _faces = ( -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 0, 8, 3, -1, -1, -1, -1,
         -1, -1, -1, -1, -1, -1, -1, -1, 0, 1, 9, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 1, 8, 3, 9, 8, 1,
         -1, -1, -1, -1, -1, -1, -1, -1, -1, 1, 2, 11, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 0, 8, 3, 1, 2,
@@ -24,7 +24,7 @@ def _collectNewFaces(mesh):
             edge1 = mesh.getEdgeAdjacentToVertices(v1,v2)
             edge2 = mesh.getEdgeAdjacentToVertices(v2,v3)
             if (edge1 != None) and (edge2!= None):
-                newFace = Face([edge1.vertex, v2.vertex, edge2.vertex, face.vertex])
+                newFace = face.__class__([edge1.vertex, v2.vertex, edge2.vertex, face.vertex])
                 newFace.color = face.color
                 newFace.group = face.group
                 newMesh.faces.append(newFace)
@@ -37,7 +37,7 @@ def offset(mesh,offset=1,doclose=True):
     newMesh=Mesh()
     # calculate vertex normals
     for vertex in mesh.vertices:
-        vertex.vertex = Vertex(0,0,0)
+        vertex.vertex = vertex.__class__(0,0,0)
         vertex.nfaces = 0
     for face in mesh.faces:
         normal = faceUtils.normal(face)
@@ -53,7 +53,7 @@ def offset(mesh,offset=1,doclose=True):
         for vertex in face.vertices:
             offsetVertices.append(vertex.vertex)
         offsetVertices.reverse()
-        newFace = Face(offsetVertices)
+        newFace = face.__class__(offsetVertices)
         newMesh.faces.append(newFace)
         newMesh.faces.append(face)
     # create sides
@@ -63,7 +63,7 @@ def offset(mesh,offset=1,doclose=True):
                 offsetVertices = [edge.v1, edge.v2, edge.v2.vertex, edge.v1.vertex]
                 if edge.face2 == None:
                     offsetVertices.reverse()
-                newFace = Face(offsetVertices)
+                newFace = (edge.face1 or edge.face2).__class__(offsetVertices)
                 newMesh.faces.append(newFace)
     newMesh.updateAdjacencies()
     return newMesh
@@ -74,7 +74,7 @@ def subdivide(mesh):
     for edge in mesh.edges:
         edge.vertex = edge.getCenter()
     for vertex in mesh.vertices:
-        vertex.vertex = Vertex(vertex.x,vertex.y,vertex.z)
+        vertex.vertex = vertex.__class__(vertex.x,vertex.y,vertex.z)
     return _collectNewFaces(mesh)
 
 def subdivide_translate_facevertices(mesh,values):
@@ -83,7 +83,7 @@ def subdivide_translate_facevertices(mesh,values):
     for edge in mesh.edges:
         edge.vertex = edge.getCenter()
     for vertex in mesh.vertices:
-        vertex.vertex = Vertex(vertex.x,vertex.y,vertex.z)
+        vertex.vertex = vertex.__class__(vertex.x,vertex.y,vertex.z)
     _translateFaceVertices(mesh,values)
     return _collectNewFaces(mesh)
 
@@ -97,7 +97,7 @@ def _catmullVertices(mesh):
             edge.v2.fix = True
             edge.vertex = edge.getCenter()
         else:
-            vsum = Vertex()
+            vsum = edge.v1.__class__()
             nElements = 2
             vsum = vec.add(vsum, edge.v1)
             vsum = vec.add(vsum, edge.v2)
@@ -116,8 +116,8 @@ def _catmullVertices(mesh):
         if vertex.fix:
             vertex.vertex = copy.copy(vertex)
         else:
-            averageFaces = Vertex()
-            averageEdges = Vertex()
+            averageFaces = vertex.__class__()
+            averageEdges = vertex.__class__()
             nEdges = len(vertex.edges)
 
             for edge in vertex.edges:
@@ -130,7 +130,7 @@ def _catmullVertices(mesh):
             averageEdges = vec.scale(averageEdges, 2.0/nEdges)
             averageFaces = vec.scale(averageFaces, 1.0/nEdges)
 
-            v = Vertex(vertex.x, vertex.y, vertex.z)
+            v = vertex.__class__(vertex.x, vertex.y, vertex.z)
             v = vec.scale(v,nEdges-3)
             v = vec.add(v,averageFaces)
             v = vec.add(v,averageEdges)
@@ -152,20 +152,498 @@ def subdivideCatmull(mesh):
     _catmullVertices(mesh)
     return _collectNewFaces(mesh)
 
-def splitGrid(face,nU,nV):
+def subdivideAdaptive(mesh, select, levels=1, smooth=False):
+    """
+    Subdivides only the faces of a mesh selected by a predicate, e.g.
+    `lambda f: faceUtils.curvature(f) > 0.1` or `lambda f: faceUtils.area(f) > 4`.
+    Selected faces are split into quads like `subdivide`. Unselected
+    neighbours keep their shape but get the new edge points inserted into
+    their vertex list, so that the mesh stays closed without T-junctions.
+    Unselected faces whose edges are all split are subdivided as well.
+    The predicate is evaluated again on the new faces of every level.
+
+    Arguments:
+    ----------
+    mesh : mola.core.Mesh
+        The mesh to be subdivided, with updated adjacencies
+    select : function
+        Returns True for a face to be subdivided
+    levels : int
+        The number of subdivision steps, default 1
+    smooth : bool
+        Move the points inside the selected area like `subdivideCatmull`,
+        points at its border stay in place, default False
+    """
+    for level in range(levels):
+        for face in mesh.faces:
+            face.vertex = faceUtils.center(face) if select(face) else None
+        _closeAdaptiveSelection(mesh)
+        if not any(face.vertex is not None for face in mesh.faces):
+            break
+        _adaptiveVertices(mesh, smooth)
+        mesh = _collectAdaptiveFaces(mesh)
+    return mesh
+
+def _closeAdaptiveSelection(mesh):
+    # selects unselected faces whose edges are all split, until none is left
+    changed = True
+    while changed:
+        changed = False
+        for face in mesh.faces:
+            if face.vertex is not None:
+                continue
+            v1 = face.vertices[-1]
+            for v2 in face.vertices:
+                edge = mesh.getEdgeAdjacentToVertices(v1, v2)
+                if not _isSplitEdge(edge):
+                    break
+                v1 = v2
+            else:
+                face.vertex = faceUtils.center(face)
+                changed = True
+
+def _isSplitEdge(edge):
+    return ((edge.face1 is not None and edge.face1.vertex is not None)
+            or (edge.face2 is not None and edge.face2.vertex is not None))
+
+def _adaptiveVertices(mesh, smooth):
+    for edge in mesh.edges:
+        edge.vertex = None
+        if not _isSplitEdge(edge):
+            continue
+        edge.vertex = edge.getCenter()
+        if (smooth and edge.face1 is not None and edge.face2 is not None
+                and edge.face1.vertex is not None and edge.face2.vertex is not None):
+            vsum = vec.add(vec.add(edge.v1, edge.v2), vec.add(edge.face1.vertex, edge.face2.vertex))
+            edge.vertex = vec.scale(vsum, 0.25)
+        if edge.v1.fix and edge.v2.fix:
+            edge.vertex.fix = True
+
+    for vertex in mesh.vertices:
+        vertex.vertex = copy.copy(vertex)
+        if not smooth or vertex.fix:
+            continue
+        # only vertices inside the selected area are moved
+        faces = []
+        for edge in vertex.edges:
+            face = edge.face1
+            if edge.v2 is vertex:
+                face = edge.face2
+            if face is None or face.vertex is None:
+                break
+            faces.append(face)
+        else:
+            nEdges = len(vertex.edges)
+            if nEdges == 0 or any(edge.face1 is None or edge.face2 is None for edge in vertex.edges):
+                continue
+            averageFaces = vertex.__class__()
+            averageEdges = vertex.__class__()
+            for face, edge in zip(faces, vertex.edges):
+                averageFaces = vec.add(averageFaces, face.vertex)
+                averageEdges = vec.add(averageEdges, edge.getCenter())
+            v = vec.scale(vertex, nEdges - 3)
+            v = vec.add(v, vec.scale(averageFaces, 1.0 / nEdges))
+            v = vec.add(v, vec.scale(averageEdges, 2.0 / nEdges))
+            v = vec.scale(v, 1.0 / nEdges)
+            vertex.vertex.x = v.x
+            vertex.vertex.y = v.y
+            vertex.vertex.z = v.z
+
+def _collectAdaptiveFaces(mesh):
+    newMesh = Mesh()
+    for face in mesh.faces:
+        if face.vertex is not None:
+            v1 = face.vertices[-2]
+            v2 = face.vertices[-1]
+            for v3 in face.vertices:
+                edge1 = mesh.getEdgeAdjacentToVertices(v1, v2)
+                edge2 = mesh.getEdgeAdjacentToVertices(v2, v3)
+                newFace = face.__class__([edge1.vertex, v2.vertex, edge2.vertex, face.vertex])
+                faceUtils.copyProperties(face, newFace)
+                newMesh.faces.append(newFace)
+                v1 = v2
+                v2 = v3
+        else:
+            # keep the face and insert the points of split edges, starting
+            # at an edge which is not split, so that the first three
+            # vertices (used for the normal) are not collinear
+            n = len(face.vertices)
+            start = 0
+            while mesh.getEdgeAdjacentToVertices(face.vertices[start], face.vertices[(start + 1) % n]).vertex is not None:
+                start += 1
+            vertices = []
+            for i in range(start, start + n):
+                v1 = face.vertices[i % n]
+                v2 = face.vertices[(i + 1) % n]
+                vertices.append(v1.vertex)
+                edge = mesh.getEdgeAdjacentToVertices(v1, v2)
+                if edge.vertex is not None:
+                    vertices.append(edge.vertex)
+            newFace = face.__class__(vertices)
+            faceUtils.copyProperties(face, newFace)
+            newMesh.faces.append(newFace)
+    newMesh.updateAdjacencies()
+    return newMesh
+
+class LimitSurface:
+    """A `LimitSurface` evaluates points and normals of the Catmull-Clark
+    limit surface of a control mesh, without subdividing the whole mesh.
+    Quads whose vertices all have 4 quads around them are bicubic B-spline
+    patches. Other faces are subdivided locally, only their 1-ring, until
+    the queried point lies in a regular patch or `maxLevel` is reached.
+    Boundary and `fix` vertices keep their position like in `subdivideCatmull`.
+    The patch of a face is built once and cached, the cost of a query does
+    not depend on the size of the mesh.
+
+    A quad is parameterized with u from vertex 0 to vertex 1 and v from
+    vertex 0 to vertex 3. Other faces are split into one quad per corner,
+    u runs from the corner vertex towards the next vertex and v towards the
+    previous vertex, (1,1) is the face center.
+
+    Attributes
+    ----------
+    mesh : mola.core.Mesh
+        The control mesh, with updated adjacencies.
+    maxLevel : int
+        The maximum number of local subdivisions.
+    patches : dict
+        The cached patches by face id.
+    """
+    def __init__(self, mesh, maxLevel=10):
+        self.mesh = mesh
+        self.maxLevel = maxLevel
+        self.patches = {}
+
+    def evaluate(self, face, u, v, corner=0):
+        """
+        Returns the point and the unit normal of the limit surface
+        at (u,v) of a face, as `Vertex` objects.
+
+        Arguments:
+        ----------
+        face : mola.core.Face
+            A face of the control mesh
+        u, v : float
+            The parameters on the face (0 to 1)
+        corner : int
+            For faces which are not quads, the corner quad of (u,v), default 0
+        """
+        patch = self._getPatch(face)
+        if len(face.vertices) != 4:
+            patch = _limitSubdivide(patch, corner)
+        level = 0
+        while True:
+            if patch.controlPoints is None and patch.regular is None:
+                patch.controlPoints = _regularControlPoints(patch)
+                patch.regular = patch.controlPoints is not None
+            if patch.regular:
+                point, normal = _evaluateBSpline(patch.controlPoints, u, v)
+                break
+            if level == self.maxLevel:
+                point, normal = _evaluateBilinear(patch, u, v)
+                break
+            # continue in the child quad of (u,v), the parameters of
+            # the child start at its corner of the face
+            if u < 0.5 and v < 0.5:
+                corner, u, v = 0, 2 * u, 2 * v
+            elif v < 0.5:
+                corner, u, v = 1, 2 * v, 2 * (1 - u)
+            elif u >= 0.5:
+                corner, u, v = 2, 2 * (1 - u), 2 * (1 - v)
+            else:
+                corner, u, v = 3, 2 * (1 - v), 2 * u
+            patch = _limitSubdivide(patch, corner)
+            level += 1
+        vertexClass = face.vertices[0].__class__
+        return vertexClass(*point), vertexClass(*normal)
+
+    def getPoint(self, face, u, v, corner=0):
+        """
+        Returns the point of the limit surface at (u,v) of a face, see `evaluate`.
+        """
+        return self.evaluate(face, u, v, corner)[0]
+
+    def getNormal(self, face, u, v, corner=0):
+        """
+        Returns the unit normal of the limit surface at (u,v) of a face, see `evaluate`.
+        """
+        return self.evaluate(face, u, v, corner)[1]
+
+    def clearCache(self):
+        """
+        Clears the cached patches, necessary after moving vertices of the mesh.
+        """
+        self.patches = {}
+
+    def _getPatch(self, face):
+        entry = self.patches.get(id(face))
+        if entry is None or entry[0] is not face:
+            entry = (face, _limitPatch(self.mesh, face))
+            self.patches[id(face)] = entry
+        return entry[1]
+
+class _LimitPatch:
+    # a face (index 0) and its 1-ring as indexed points
+    def __init__(self, points, faces, fix, boundaryEdges):
+        self.points = points
+        self.faces = faces
+        self.fix = fix
+        self.boundaryEdges = boundaryEdges
+        self.controlPoints = None
+        self.regular = None
+
+def _limitPatch(mesh, face):
+    # collects the face and all faces sharing a vertex with it
+    faces = [face]
+    faceIds = set([id(face)])
+    edges = []
+    for vertex in face.vertices:
+        for edge in vertex.edges:
+            edges.append(edge)
+            for f in (edge.face1, edge.face2):
+                if f is not None and id(f) not in faceIds:
+                    faceIds.add(id(f))
+                    faces.append(f)
+    pointIds = {}
+    points = []
+    fix = []
+    indexedFaces = []
+    for f in faces:
+        indices = []
+        for v in f.vertices:
+            index = pointIds.get(id(v))
+            if index is None:
+                index = len(points)
+                pointIds[id(v)] = index
+                points.append((v.x, v.y, v.z))
+                fix.append(v.fix)
+            indices.append(index)
+        indexedFaces.append(indices)
+    boundaryEdges = set()
+    for f in faces:
+        v1 = f.vertices[-1]
+        for v2 in f.vertices:
+            edge = mesh.getEdgeAdjacentToVertices(v1, v2)
+            if edge is not None and (edge.face1 is None or edge.face2 is None):
+                boundaryEdges.add(_limitEdgeKey(pointIds[id(v1)], pointIds[id(v2)]))
+            v1 = v2
+    return _LimitPatch(points, indexedFaces, fix, boundaryEdges)
+
+def _limitEdgeKey(i, j):
+    return (i, j) if i < j else (j, i)
+
+def _limitSubdivide(patch, corner):
+    # one Catmull-Clark step of the patch, returns the patch of the
+    # child quad of face 0 at corner and its 1-ring
+    points = patch.points
+    faces = patch.faces
+    boundaryVertices = set()
+    for i, j in patch.boundaryEdges:
+        boundaryVertices.add(i)
+        boundaryVertices.add(j)
+    facePoints = [_limitAverage([points[i] for i in f]) for f in faces]
+    edgeFaces = {}
+    vertexFaces = {}
+    for fi, f in enumerate(faces):
+        for k, i in enumerate(f):
+            edgeFaces.setdefault(_limitEdgeKey(i, f[k - 1]), []).append(fi)
+            vertexFaces.setdefault(i, []).append(fi)
+    # only the points needed by the child of face 0 and its 1-ring
+    newPoints = {}
+    newFix = {}
+    def edgePoint(i, j):
+        key = _limitEdgeKey(i, j)
+        if ('e',) + key not in newPoints:
+            nbs = edgeFaces[key]
+            if key in patch.boundaryEdges or len(nbs) != 2:
+                p = _limitAverage([points[i], points[j]])
+            else:
+                p = _limitAverage([points[i], points[j], facePoints[nbs[0]], facePoints[nbs[1]]])
+            newPoints[('e',) + key] = p
+            newFix[('e',) + key] = key in patch.boundaryEdges or (patch.fix[i] and patch.fix[j])
+        return ('e',) + key
+    def vertexPoint(i):
+        if ('v', i) not in newPoints:
+            p = points[i]
+            fixed = patch.fix[i] or i in boundaryVertices
+            if not fixed:
+                neighbours = set()
+                for fi in vertexFaces[i]:
+                    f = faces[fi]
+                    k = f.index(i)
+                    neighbours.add(f[k - 1])
+                    neighbours.add(f[(k + 1) % len(f)])
+                n = len(neighbours)
+                if n == len(vertexFaces[i]):
+                    averageFaces = _limitAverage([facePoints[fi] for fi in vertexFaces[i]])
+                    averageEdges = _limitAverage([_limitAverage([p, points[j]]) for j in neighbours])
+                    p = tuple(((n - 3) * p[c] + averageFaces[c] + 2 * averageEdges[c]) / n for c in range(3))
+            newPoints[('v', i)] = p
+            newFix[('v', i)] = fixed
+        return ('v', i)
+    def facePoint(fi):
+        if ('f', fi) not in newPoints:
+            newPoints[('f', fi)] = facePoints[fi]
+            newFix[('f', fi)] = False
+        return ('f', fi)
+    def child(fi, k):
+        f = faces[fi]
+        i = f[k]
+        return [vertexPoint(i), edgePoint(i, f[(k + 1) % len(f)]), facePoint(fi), edgePoint(f[k - 1], i)]
+
+    target = child(0, corner)
+    # the 1-ring: children of face 0 and of the faces around
+    # the corner and its two edges
+    nextPoint = faces[0][(corner + 1) % len(faces[0])]
+    prevPoint = faces[0][corner - 1]
+    ring = [(0, k) for k in range(len(faces[0]))]
+    for i in set((faces[0][corner], nextPoint, prevPoint)):
+        for fi in vertexFaces[i]:
+            if fi != 0:
+                ring.append((fi, faces[fi].index(i)))
+    childFaces = [target]
+    for fi, k in ring:
+        c = child(fi, k)
+        if c != target:
+            childFaces.append(c)
+    childFaces = _limitRing(childFaces)
+    keys = {}
+    indexed = []
+    for c in childFaces:
+        indexed.append([keys.setdefault(key, len(keys)) for key in c])
+    newIndex = [None] * len(keys)
+    for key, index in keys.items():
+        newIndex[index] = key
+    boundaryEdges = set()
+    for key in newIndex:
+        if key[0] == 'e' and key[1:] in patch.boundaryEdges:
+            e = keys[key]
+            for end in key[1:]:
+                if ('v', end) in keys:
+                    boundaryEdges.add(_limitEdgeKey(e, keys[('v', end)]))
+    return _LimitPatch([newPoints[key] for key in newIndex], indexed,
+                       [newFix[key] for key in newIndex], boundaryEdges)
+
+def _limitRing(faces):
+    # the first face and the faces sharing a vertex with it
+    first = set(faces[0])
+    return [faces[0]] + [f for f in faces[1:] if first.intersection(f)]
+
+def _limitAverage(points):
+    n = len(points)
+    return (sum(p[0] for p in points) / n, sum(p[1] for p in points) / n, sum(p[2] for p in points) / n)
+
+def _regularControlPoints(patch):
+    # the 4x4 B-spline control points of face 0, None if it is not regular
+    faces = patch.faces
+    target = faces[0]
+    if len(target) != 4:
+        return None
+    for i in target:
+        if patch.fix[i] or any(i in edge for edge in patch.boundaryEdges):
+            return None
+        around = [f for f in faces if i in f]
+        if len(around) != 4 or any(len(f) != 4 for f in around):
+            return None
+    def across(a, b):
+        # the two outer vertices of the quad on the other side of edge a->b
+        for f in faces[1:]:
+            if a in f and b in f:
+                k = f.index(a)
+                if f[k - 1] == b:
+                    return f[(k + 1) % 4], f[k - 2]
+        return None
+    def diagonal(a, x, y):
+        for f in faces[1:]:
+            if a in f and x in f and y in f:
+                return [i for i in f if i not in (a, x, y)][0]
+        return None
+    a0, a1, a2, a3 = target
+    sides = [across(a0, a1), across(a1, a2), across(a2, a3), across(a3, a0)]
+    if None in sides:
+        return None
+    p10, p20 = sides[0]
+    p31, p32 = sides[1]
+    p23, p13 = sides[2]
+    p02, p01 = sides[3]
+    p00 = diagonal(a0, p10, p01)
+    p30 = diagonal(a1, p20, p31)
+    p33 = diagonal(a2, p32, p23)
+    p03 = diagonal(a3, p13, p02)
+    if None in (p00, p30, p33, p03):
+        return None
+    grid = [[p00, p01, p02, p03], [p10, a0, a3, p13], [p20, a1, a2, p23], [p30, p31, p32, p33]]
+    return [[patch.points[i] for i in row] for row in grid]
+
+def _bSplineBasis(t):
+    it = 1 - t
+    basis = (it * it * it / 6, (3 * t * t * t - 6 * t * t + 4) / 6,
+             (-3 * t * t * t + 3 * t * t + 3 * t + 1) / 6, t * t * t / 6)
+    derivative = (-it * it / 2, (3 * t * t - 4 * t) / 2, (-3 * t * t + 2 * t + 1) / 2, t * t / 2)
+    return basis, derivative
+
+def _evaluateBSpline(controlPoints, u, v):
+    bu, du = _bSplineBasis(u)
+    bv, dv = _bSplineBasis(v)
+    point = [0, 0, 0]
+    tangentU = [0, 0, 0]
+    tangentV = [0, 0, 0]
+    for i in range(4):
+        for j in range(4):
+            p = controlPoints[i][j]
+            for c in range(3):
+                point[c] += bu[i] * bv[j] * p[c]
+                tangentU[c] += du[i] * bv[j] * p[c]
+                tangentV[c] += bu[i] * dv[j] * p[c]
+    return tuple(point), _limitNormal(tangentU, tangentV)
+
+def _evaluateBilinear(patch, u, v):
+    # close to the limit after many levels, used around irregular vertices
+    p0, p1, p2, p3 = [patch.points[i] for i in patch.faces[0]]
+    point = tuple((1 - u) * (1 - v) * p0[c] + u * (1 - v) * p1[c] + u * v * p2[c] + (1 - u) * v * p3[c]
+                  for c in range(3))
+    tangentU = [p1[c] - p0[c] + p2[c] - p3[c] for c in range(3)]
+    tangentV = [p3[c] - p0[c] + p2[c] - p1[c] for c in range(3)]
+    return point, _limitNormal(tangentU, tangentV)
+
+def _limitNormal(tangentU, tangentV):
+    x = tangentU[1] * tangentV[2] - tangentU[2] * tangentV[1]
+    y = tangentU[2] * tangentV[0] - tangentU[0] * tangentV[2]
+    z = tangentU[0] * tangentV[1] - tangentU[1] * tangentV[0]
+    length = math.sqrt(x * x + y * y + z * z)
+    if length == 0:
+        return (x, y, z)
+    return (x / length, y / length, z / length)
+
+def splitGrid(face,nU,nV,cache=None):
     """
     splits a triangle, quad or a rectangle into a regular grid
+
+    Arguments:
+    ----------
+    face : mola.core.Face
+        The face to be split
+    nU, nV : int
+        The number of rows and columns
+    cache : dict
+        Optional, shared by the splits of neighbouring faces, so that they
+        reuse the same vertices along their common edges, default None.
+        Use a new cache for every mesh, it must not outlive the mesh.
     """
     if len(face.vertices) > 4:
         print('too many vertices')
         return face
 
     if len(face.vertices) == 4:
-        vsU1 = _getVerticesBetween(face.vertices[0], face.vertices[1], nU)
-        vsU2 = _getVerticesBetween(face.vertices[3], face.vertices[2], nU)
+        vsU1 = _getVerticesBetween(face.vertices[0], face.vertices[1], nU, cache)
+        vsU2 = _getVerticesBetween(face.vertices[3], face.vertices[2], nU, cache)
         gridVertices = []
         for u in range(len(vsU1)):
-            gridVertices.append(_getVerticesBetween(vsU1[u], vsU2[u], nV))
+            # only the first and last row are on edges of the face
+            rowCache = cache
+            if cache is not None and 0 < u < len(vsU1) - 1:
+                rowCache = {}
+            gridVertices.append(_getVerticesBetween(vsU1[u], vsU2[u], nV, rowCache))
         faces = []
         for u in range(len(vsU1) - 1):
             vs1 = gridVertices[u]
@@ -178,11 +656,14 @@ def splitGrid(face,nU,nV):
         return faces
 
     if len(face.vertices) == 3:
-        vsU1 = _getVerticesBetween(face.vertices[0], face.vertices[1], nU)
-        vsU2 = _getVerticesBetween(face.vertices[0], face.vertices[2], nU)
+        vsU1 = _getVerticesBetween(face.vertices[0], face.vertices[1], nU, cache)
+        vsU2 = _getVerticesBetween(face.vertices[0], face.vertices[2], nU, cache)
         gridVertices = []
         for u in range(1, len(vsU1)):
-            gridVertices.append(_getVerticesBetween(vsU1[u], vsU2[u], nV))
+            rowCache = cache
+            if cache is not None and u < len(vsU1) - 1:
+                rowCache = {}
+            gridVertices.append(_getVerticesBetween(vsU1[u], vsU2[u], nV, rowCache))
         faces = []
         # triangles
         v0 = face.vertices[0]
@@ -200,7 +681,9 @@ def splitGrid(face,nU,nV):
                 faces.append(f)
         return faces
 
-def _getVerticesBetween(v1,v2,n):
+def _getVerticesBetween(v1,v2,n,cache=None):
+    if cache is not None:
+        return [_betweenRel(v1, v2, i / n, cache) for i in range(n + 1)]
     row = []
     deltaV = vec.subtract(v2, v1)
     deltaV = vec.divide(deltaV, n)
@@ -210,6 +693,27 @@ def _getVerticesBetween(v1,v2,n):
     row.append(v2)
     return row
 
+def _betweenRel(v1,v2,f,cache=None):
+    # vec.betweenRel, with a cache the point is shared by all
+    # faces along the edge v1 v2, in both directions
+    if cache is None:
+        return vec.betweenRel(v1, v2, f)
+    if id(v1) > id(v2):
+        v1, v2, f = v2, v1, 1 - f
+    f = round(f, 12)
+    if f == 0:
+        return v1
+    if f == 1:
+        return v2
+    # `Vertex` is not hashable, the entry keeps the edge vertices alive
+    # and is only used if they are still the same objects
+    key = (id(v1), id(v2), f)
+    entry = cache.get(key)
+    if entry is None or entry[0] is not v1 or entry[1] is not v2:
+        entry = (v1, v2, vec.betweenRel(v1, v2, f))
+        cache[key] = entry
+    return entry[2]
+
 def splitRelFreeQuad(face, indexEdge,  split1,  split2):
     """
     Splits a quad in two new quads through the points specified
@@ -295,7 +799,7 @@ def mesh_extrude_tapered(mesh,heights,fractions,doCaps):
     new_mesh=Mesh()
     for face,height,fraction,doCap in zip(mesh.faces,heights,fractions,doCaps):
         new_mesh.faces.extend(extrudeTapered(face,height,fraction,doCap))
-    newMesh.updateAdjacencies()
+    new_mesh.updateAdjacencies()
     return new_mesh
 
 def extrudeTapered(face, height=0.0, fraction=0.5,doCap=True):
@@ -441,7 +945,7 @@ def mesh_extrude_to_point_center(mesh,heights,doExtrudes):
             new_mesh.faces.extend(extrudeToPointCenter(face,height))
         else:
             new_mesh.faces.append(face)
-    newMesh.updateAdjacencies()
+    new_mesh.updateAdjacencies()
     return new_mesh
 
 def offsetPlanar(face,offsets):
@@ -482,7 +986,22 @@ def splitOffsets(face,offsets):
             f.vertices.reverse()
     return faces
 
-def splitRelMultiple(face, direction, splits):
+def splitRelMultiple(face, direction, splits, cache=None):
+    """
+    Splits face in given direction at several positions.
+
+    Arguments:
+    ----------
+    face : mola.core.Face
+        The face to be split
+    direction : integer (-1 or 0)
+    splits : list
+        Positions of the splits relative to initial face points (0 to 1)
+    cache : dict
+        Optional, shared by the splits of neighbouring faces, so that they
+        reuse the same vertices along their common edges, default None.
+        Use a new cache for every mesh, it must not outlive the mesh.
+    """
     sA = []
     sA.append(face.vertices[direction])
     lA = face.vertices[direction + 1]
@@ -491,8 +1010,8 @@ def splitRelMultiple(face, direction, splits):
     lB = face.vertices[(direction + 2) % len(face.vertices)]
 
     for i in range(len(splits)):
-        sA.append(vec.betweenRel(sA[0], lA,splits[i]))
-        sB.append(vec.betweenRel(sB[0], lB,splits[i]))
+        sA.append(_betweenRel(sA[0], lA, splits[i], cache))
+        sB.append(_betweenRel(sB[0], lB, splits[i], cache))
     sA.append(lA)
     sB.append(lB)
 
@@ -508,7 +1027,7 @@ def splitRelMultiple(face, direction, splits):
             result.append(f)
     return result
 
-def splitRel(face, direction, split):
+def splitRel(face, direction, split, cache=None):
     """
     Splits face in given direction.
 
@@ -519,10 +1038,12 @@ def splitRel(face, direction, split):
     direction : integer (-1 or 0)
     split : float
         Position of the split relative to initial face points (0 to 1)
+    cache : dict
+        Optional, see `splitRelMultiple`, default None
     """
-    return splitRelMultiple(face, direction, [split])
+    return splitRelMultiple(face, direction, [split], cache)
 
-def splitFrame(face, w):
+def splitFrame(face, w, cache=None):
     """
     Creates an offset frame with quad corners. Works only with convex shapes.
 
@@ -532,6 +1053,10 @@ def splitFrame(face, w):
         The face to be split
     w : float
         The width of the offset frame
+    cache : dict
+        Optional, shared by the splits of neighbouring faces, so that they
+        reuse the same vertices along their common edges, default None.
+        Use a new cache for every mesh, it must not outlive the mesh.
     """
     faces = []
     innerVertices = []
@@ -550,8 +1075,8 @@ def splitFrame(face, w):
       w1 = w / math.sin(th1)
       w2 = w / math.sin(th2)
 
-      vs1 = _getVerticesFrame(v, vn, w1, w2)
-      vs2 = _getVerticesFrame(_getVerticesFrame(vp, v, w1, w1)[2], _getVerticesFrame(vn, vnn, w2, w2)[1], w1, w2)
+      vs1 = _getVerticesFrame(v, vn, w1, w2, cache)
+      vs2 = _getVerticesFrame(_getVerticesFrame(vp, v, w1, w1, cache)[2], _getVerticesFrame(vn, vnn, w2, w2, cache)[1], w1, w2)
       innerVertices.append(vs2[1])
       f1 = Face([vs1[0], vs2[0], vs2[1], vs1[1]])
       faceUtils.copyProperties(face, f1)
@@ -563,7 +1088,10 @@ def splitFrame(face, w):
     faces.append(fInner)
     return faces
 
-def _getVerticesFrame(v1,v2,w1,w2):
+def _getVerticesFrame(v1,v2,w1,w2,cache=None):
+    if cache is not None:
+        d = vec.distance(v1, v2)
+        return [v1, _betweenRel(v1, v2, w1 / d, cache), _betweenRel(v2, v1, w2 / d, cache), v2]
     p1 = vec.betweenAbs(v1, v2, w1)
     p2 = vec.betweenAbs(v2, v1, w2)
     return [v1, p1, p2, v2]
@@ -0,0 +1,58 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from mola.arrayGrid import ArrayGrid
+
+
+def _layouts():
+    values = np.arange(6 * 5 * 4, dtype=float).reshape(6, 5, 4)
+    strided = np.arange(12 * 5 * 4, dtype=float).reshape(12, 5, 4)[::2]
+    transposed = np.ascontiguousarray(values.transpose(2, 1, 0)).transpose(2, 1, 0)
+    return [np.asfortranarray(values), strided, transposed]
+
+
+@pytest.mark.parametrize('values', _layouts())
+def test_set_index_writes_through_non_contiguous_arrays(values):
+    g = ArrayGrid(6, 5, 4)
+    g.setArray(values)
+    g.set_index(-1.0, 7)
+    g.set_xyz(-2.0, 1, 2, 3)
+    assert g.array[g.getX(7), g.getY(7), g.getZ(7)] == -1.0
+    assert g.array[1, 2, 3] == -2.0
+    assert g.get_index(g.getIndex(1, 2, 3)) == -2.0
+
+
+@pytest.mark.parametrize('values', _layouts())
+def test_assigned_arrays_keep_values_a_view(values):
+    g = ArrayGrid(6, 5, 4, values=values)
+    assert g.array.flags['C_CONTIGUOUS']
+    g.values = values
+    g.set_index(-1.0, 0)
+    assert g.array[0, 0, 0] == -1.0
+    g.array = values
+    g.set_index(-1.0, 0)
+    assert g.array[0, 0, 0] == -1.0
+    assert np.array_equal(g.array[1:], values[1:])
+
+
+def test_sum_nbs_matches_get_nbs():
+    rng = np.random.RandomState(0)
+    g = ArrayGrid(5, 4, 6, values=rng.randint(0, 5, 5 * 4 * 6))
+    for continuous in (False, True):
+        for nbs, mode in ((6, 1), (18, 2), (26, 3)):
+            sums = g.sumNbs(nbs, continuous).ravel()
+            for i in range(g.length):
+                assert sums[i] == sum(g.values[j] for j in g.getNbs3D(i, mode, continuous))
+
+
+def test_constructor_and_from_grid_copy_their_input():
+    source = np.zeros((3, 3, 3))
+    g = ArrayGrid(3, 3, 3, values=source)
+    g.array[1, 1, 1] = 7.0
+    assert source[1, 1, 1] == 0.0
+    copy = ArrayGrid.fromGrid(g)
+    copy.array[1, 1, 1] = 9.0
+    copy.set_index(5.0, 0)
+    assert g.array[1, 1, 1] == 7.0
+    assert g.array[0, 0, 0] == 0.0
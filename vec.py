@@ -11,7 +11,7 @@ import math as math
 from mola.core import Vertex
 
 def add(v1,v2):
-    return Vertex(v1.x + v2.x, v1.y + v2.y, v1.z + v2.z)
+    return v1.__class__(v1.x + v2.x, v1.y + v2.y, v1.z + v2.z)
 
 def angle(v1,v2):
     a = unitize(v1)
@@ -28,13 +28,13 @@ def angleTriangle(vPrevious,v,vNext):
   return math.acos((vvn * vvn + vvp * vvp - vnvp * vnvp) / (2 * vvn * vvp))
 
 def subtract(v1,v2):
-    return Vertex(v1.x - v2.x, v1.y - v2.y, v1.z - v2.z)
+    return v1.__class__(v1.x - v2.x, v1.y - v2.y, v1.z - v2.z)
 
 def scale(v,factor):
-    return Vertex(v.x * factor, v.y * factor, v.z * factor)
+    return v.__class__(v.x * factor, v.y * factor, v.z * factor)
 
 def divide(v,factor):
-    return Vertex(v.x / factor, v.y / factor, v.z / factor)
+    return v.__class__(v.x / factor, v.y / factor, v.z / factor)
 
 def length(v):
     return math.sqrt(v.x * v.x + v.y * v.y + v.z * v.z)
@@ -46,7 +46,7 @@ def unitize(v):
     return divide(v,l)
 
 def cross(v1,v2):
-    return Vertex(v1.y * v2.z - v2.y * v1.z, v1.z * v2.x - v2.z * v1.x, v1.x * v2.y - v2.x * v1.y)
+    return v1.__class__(v1.y * v2.z - v2.y * v1.z, v1.z * v2.x - v2.z * v1.x, v1.x * v2.y - v2.x * v1.y)
 
 def dot(v1,v2):
     return v1.x * v2.x + v1.y * v2.y + v1.z * v2.z
@@ -58,10 +58,10 @@ def distance(v1,v2):
     return math.sqrt(dX*dX+dY*dY+dZ*dZ)
 
 def center(v1,v2):
-    return Vertex((v1.x+v2.x)/2,(v1.y+v2.y)/2,(v1.z+v2.z)/2)
+    return v1.__class__((v1.x+v2.x)/2,(v1.y+v2.y)/2,(v1.z+v2.z)/2)
 
 def betweenRel( v1,  v2,  f):
-    return Vertex((v2.x - v1.x) * f + v1.x, (v2.y - v1.y) * f + v1.y, (v2.z - v1.z) * f + v1.z)
+    return v1.__class__((v2.x - v1.x) * f + v1.x, (v2.y - v1.y) * f + v1.y, (v2.z - v1.z) * f + v1.z)
 
 def betweenAbs( v1,  v2,  f):
     d = distance(v1,v2)
@@ -97,4 +97,4 @@ def offsetPoint(v1,  v2,  v3,  offset1,  offset2):
     return lineLineIntersection(line1.x,line1.y,line2.x,line2.y)
 
 def rot2D90(vertex):
-    return Vertex(-vertex.y, vertex.x, vertex.z)
+    return vertex.__class__(-vertex.y, vertex.x, vertex.z)